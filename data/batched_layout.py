@@ -0,0 +1,218 @@
+import numpy as np
+import math
+
+
+# Fruchterman and Reingold layout of card_creator computed for every card of a deck at once
+# symbols are stored as (cards, symbols) sizes and numbers and (cards, symbols, 2) coordinates
+# forces are the same as in card_creator, only the loops over cards and symbols became array operations
+# loops left over other symbols and graph edges keep the summation order of the per card version
+RADIUS_SQUARED = 2401
+COOLING_SCHEDULES = ["linear", "exponential", "adaptive"]
+EXPONENTIAL_END = 0.01
+ADAPTIVE_FACTOR = 0.9
+ADAPTIVE_STEPS = 5
+
+
+def norms(vectors):
+    return np.sqrt(vectors[..., 0] * vectors[..., 0] + vectors[..., 1] * vectors[..., 1])
+
+
+def repulsionVectors(coords, numbers, otherIndex):
+    otherCoords = coords[:, otherIndex:otherIndex + 1, :]
+    midpoint = (coords + otherCoords) / 2
+    vector = coords - midpoint
+    length = norms(vector)
+
+    # symbols in the very same place are pushed away from the center or diagonally from it
+    multiplier = np.where(numbers < numbers[:, otherIndex:otherIndex + 1], 1.0, -1.0)
+    coordsLength = norms(coords)
+    fallback = np.where((coordsLength == 0)[..., None], 1.0, coords)
+    fallbackLength = np.where(coordsLength == 0, math.sqrt(2), coordsLength)
+    isSamePlace = length == 0
+    vector = np.where(isSamePlace[..., None], fallback * multiplier[..., None], vector)
+    length = np.where(isSamePlace, fallbackLength, length)
+
+    return vector / length[..., None]
+
+
+def repulsionDisplacements(coords, sizes, numbers, kParameter, divisor):
+    distanceBuffer = 12 / divisor
+    shifts = sizes / 2
+    centers = coords + shifts[..., None]
+    symbolIndices = np.arange(sizes.shape[1])
+    displacements = np.zeros_like(coords)
+    for otherIndex in range(sizes.shape[1]):
+        otherShifts = shifts[:, otherIndex:otherIndex + 1]
+        distance = centers - centers[:, otherIndex:otherIndex + 1, :]
+        length = norms(distance)
+        # to signal that the symbols are overlapping
+        length = np.where(length < shifts + otherShifts, 0, length)
+
+        isApart = length > 0
+        safeLength = np.where(isApart, length, 1)
+        distance = np.where(isApart[..., None],
+            distance * (length - shifts - otherShifts)[..., None] / safeLength[..., None], distance)
+        length = np.where(isApart, norms(distance), length)
+
+        isClose = length < distanceBuffer
+        distance = np.where(isClose[..., None], repulsionVectors(coords, numbers, otherIndex), distance)
+        length = np.where(isClose, 1, length)
+        forceModifier = np.where(isClose, 1.2, 1)
+
+        # ignore repulsive forces for large distances and the symbol itself
+        isApplied = (length <= 40) & (symbolIndices != otherIndex)[None, :]
+        force = distance * ((kParameter / length) ** 2)[..., None] * forceModifier[..., None]
+        displacements += np.where(isApplied[..., None], force, 0)
+
+    return displacements
+
+
+def containmentMask(coords, sizes, first, second):
+    firstCoords = coords[:, first]
+    secondCoords = coords[:, second]
+    isFirstHigher = firstCoords[:, 1] < secondCoords[:, 1]
+    isFirstEarlier = firstCoords[:, 0] < secondCoords[:, 0]
+    higherSize = np.where(isFirstHigher, sizes[:, first], sizes[:, second])
+    lowerVertical = np.where(isFirstHigher, secondCoords[:, 1], firstCoords[:, 1])
+    earlierCoords = np.where(isFirstEarlier[:, None], firstCoords, secondCoords)
+    earlierSize = np.where(isFirstEarlier, sizes[:, first], sizes[:, second])
+    laterHorizontal = np.where(isFirstEarlier, secondCoords[:, 0], firstCoords[:, 0])
+
+    startOfEarlier = earlierCoords[:, 0]
+    endOfEarlier = startOfEarlier + earlierSize
+    startOfHigher = earlierCoords[:, 1]
+    endOfHigher = startOfHigher + higherSize
+
+    isHorizontalyAligned = (laterHorizontal >= startOfEarlier) & (laterHorizontal < endOfEarlier)
+    isVerticalyAligned = (lowerVertical >= startOfHigher) & (lowerVertical < endOfHigher)
+    return isHorizontalyAligned & isVerticalyAligned
+
+
+def attractionEdges(symbols):
+    # we assume each element is connected with the next one in a circular way
+    edges = [(i, (i + 1) % symbols) for i in range(symbols)]
+    # we assume the first element is also connected to every other element
+    edges += [(0, i) for i in range(2, symbols - 1)]
+    # and so is the second one
+    edges += [(1, i) for i in range(3, symbols)]
+    return edges
+
+
+def applyAttractionDisplacements(displacements, coords, sizes, kParameter, divisor):
+    distanceBuffer = 15 / divisor
+    shifts = sizes / 2
+    centers = coords + shifts[..., None]
+    for first, second in attractionEdges(sizes.shape[1]):
+        distance = centers[:, second] - centers[:, first]
+        length = norms(distance)
+        distance = distance / np.where(length > 0, length, 1)[:, None]
+        length = np.maximum(length - (shifts[:, first] + shifts[:, second] + distanceBuffer), 0)
+        force = distance * (length ** 2)[:, None] / kParameter
+        force = np.where(containmentMask(coords, sizes, first, second)[:, None], 0, force)
+        displacements[:, first] += force
+        displacements[:, second] -= force
+
+
+def clampCoords(coords, sizes):
+    # same geometry as card_creator.Symbol.clampCoords
+    # coords are calculated as if symbol will be drawn starting from (0, 0)
+    horizontal = np.minimum(49 - sizes, np.maximum(-49, coords[..., 0]))
+    vertical = np.minimum(49 - sizes, np.maximum(-49, coords[..., 1]))
+    distance = np.sqrt(horizontal * horizontal + vertical * vertical)
+
+    isRight = horizontal > 0
+    isLower = vertical > 0
+    isRightOnly = isRight & ~isLower
+    isLowerOnly = isLower & ~isRight
+    rightLimit = np.sqrt(np.maximum(RADIUS_SQUARED - vertical * vertical, 0)) - sizes - 2
+    lowerLimit = np.sqrt(np.maximum(RADIUS_SQUARED - horizontal * horizontal, 0)) - sizes - 2
+    isRightClamped = isRightOnly & (horizontal > rightLimit)
+    isLowerClamped = isLowerOnly & (vertical > lowerLimit)
+
+    limit = np.where(isRight & isLower, 49 - sizes - 7, 49)
+    isScaled = ~(isRightOnly | isLowerOnly) & (distance >= limit)
+    scalar = np.where(isScaled, limit / np.where(distance > 0, distance, 1), 1)
+
+    newHorizontal = np.where(isRightClamped, rightLimit, np.where(isLowerClamped, horizontal + 1, horizontal))
+    newVertical = np.where(isLowerClamped, lowerLimit, np.where(isRightClamped, vertical + 1, vertical))
+    return np.stack([newHorizontal * scalar, newVertical * scalar], axis=-1)
+
+
+def coolTemperature(cooling, temperature, startTemperature, iterations, energy, previousEnergy, progress):
+    # works on single values as well as on arrays holding a temperature for each card
+    if cooling == "linear":
+        return temperature - startTemperature / iterations, progress
+    if cooling == "exponential":
+        # reaches a hundredth of the starting temperature after all iterations
+        return temperature * EXPONENTIAL_END ** (1 / iterations), progress
+
+    # adaptive cooling of Hu, heats up after a few improving steps in a row and cools down after a worse one
+    isImproved = energy < previousEnergy
+    progress = np.where(isImproved, progress + 1, 0)
+    isHeated = progress >= ADAPTIVE_STEPS
+    temperature = np.where(isImproved, np.where(isHeated, temperature / ADAPTIVE_FACTOR, temperature),
+        temperature * ADAPTIVE_FACTOR)
+    return np.minimum(temperature, startTemperature), np.where(isHeated, 0, progress)
+
+
+def overlapEnergy(coords, sizes):
+    # total area shared by the symbols of each card, 0 means nothing has to be unravelled
+    coords = np.asarray(coords, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    ends = coords + sizes[..., None]
+    overlap = np.minimum(ends[:, :, None, :], ends[:, None, :, :]) - np.maximum(coords[:, :, None, :], coords[:, None, :, :])
+    areas = np.prod(np.maximum(overlap, 0), axis=-1)
+    # every pair is counted twice and every symbol overlaps itself
+    return (areas.sum(axis=(1, 2)) - (sizes * sizes).sum(axis=1)) / 2
+
+
+def annealCards(coords, sizes, numbers, symbols, iterations=50, temperature=15, cooling="linear", tolerance=None):
+    # every card is annealed on its own schedule and stops once none of its symbols moves by tolerance or more
+    # returns coordinates and the number of iterations each card took
+    if cooling not in COOLING_SCHEDULES:
+        raise ValueError("Unknown cooling schedule " + str(cooling))
+    coords = np.array(coords, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    numbers = np.asarray(numbers)
+    divisor = math.sqrt(symbols)
+    kParameter = math.sqrt(10000 / symbols)
+    cards = coords.shape[0]
+    temperatures = np.full(cards, float(temperature))
+    progress = np.zeros(cards, dtype=np.int64)
+    previousEnergy = np.full(cards, np.inf)
+    iterationCounts = np.zeros(cards, dtype=np.int64)
+    active = np.arange(cards)
+    for loop in range(iterations):
+        if len(active) == 0:
+            break
+        activeCoords = coords[active]
+        activeSizes = sizes[active]
+        displacements = repulsionDisplacements(activeCoords, activeSizes, numbers[active], kParameter, divisor)
+        applyAttractionDisplacements(displacements, activeCoords, activeSizes, kParameter, divisor)
+
+        dispLength = norms(displacements)
+        isMoved = dispLength != 0
+        safeLength = np.where(isMoved, dispLength, 1)
+        steps = np.minimum(dispLength, temperatures[active][:, None])
+        moved = activeCoords + displacements / safeLength[..., None] * steps[..., None]
+        newCoords = np.where(isMoved[..., None], clampCoords(moved, activeSizes), activeCoords)
+        coords[active] = newCoords
+        iterationCounts[active] += 1
+
+        energy = (dispLength * dispLength).sum(axis=1)
+        temperatures[active], progress[active] = coolTemperature(cooling, temperatures[active], temperature,
+            iterations, energy, previousEnergy[active], progress[active])
+        previousEnergy[active] = energy
+        if tolerance is not None:
+            # measured after clamping, symbols pushed against the edge of the card don't move at all
+            active = active[norms(newCoords - activeCoords).max(axis=1) >= tolerance]
+
+    return coords, iterationCounts
+
+
+def layoutCards(coords, sizes, numbers, symbols, iterations=50, temperature=15, cooling="linear", tolerance=None):
+    return annealCards(coords, sizes, numbers, symbols, iterations, temperature, cooling, tolerance)[0]
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
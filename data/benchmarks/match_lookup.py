@@ -0,0 +1,66 @@
+import numpy as np
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import field_projector as fp
+import match_index as mi
+
+
+# throughput of answering which symbol two cards share
+# scanning both symbol lists is what validating a guess against the cards of GameTypes.json takes,
+# the table and cyclic indices of match_index must give the same symbol for every pair
+def scanSharedSymbol(cards, first, second):
+    for symbol in cards[first]:
+        if symbol in cards[second]:
+            return symbol
+    return None
+
+
+def randomPairs(cards, count, generator):
+    firsts = generator.integers(0, cards, count)
+    seconds = (firsts + generator.integers(1, cards, count)) % cards
+    return firsts.tolist(), seconds.tolist()
+
+
+def verifyEquivalence(cards, indices):
+    for first in range(len(cards)):
+        for second in range(len(cards)):
+            if first == second:
+                continue
+            expected = scanSharedSymbol(cards, first, second)
+            for index in indices:
+                if index.sharedSymbol(first, second) != expected:
+                    raise AssertionError(index.kind + " index differs for cards " + str(first) + " and " + str(second))
+
+
+def throughput(lookup, firsts, seconds, repeat=5):
+    timer = timeit.Timer(lambda: [lookup(first, second) for first, second in zip(firsts, seconds)])
+    return len(firsts) / min(timer.repeat(repeat, 1))
+
+
+def main():
+    generator = np.random.default_rng(0)
+    print("symbols  cards  scan [lookups/s]  table [lookups/s]  cyclic [lookups/s]  vectorized [lookups/s]")
+    for numberOfSymbols in [3, 4, 5, 6, 8, 9, 10, 12, 14, 17, 18]:
+        deck = fp.symbolDeck(numberOfSymbols, "singer")
+        cards = [card.tolist() for card in deck.cardSymbols]
+        table = mi.matchIndex(numberOfSymbols, "singer", "table")
+        cyclic = mi.matchIndex(numberOfSymbols, "singer", "cyclic")
+        verifyEquivalence(cards, [table, cyclic])
+
+        firsts, seconds = randomPairs(len(cards), 20000, generator)
+        scan = throughput(lambda first, second: scanSharedSymbol(cards, first, second), firsts, seconds)
+        tableRate = throughput(table.sharedSymbol, firsts, seconds)
+        cyclicRate = throughput(cyclic.sharedSymbol, firsts, seconds)
+        firstArray = np.array(firsts)
+        secondArray = np.array(seconds)
+        vectorized = len(firsts) / min(timeit.Timer(lambda: table.sharedSymbols(firstArray, secondArray)).repeat(5, 1))
+        print("{:7d}  {:5d}  {:16.0f}  {:17.0f}  {:18.0f}  {:22.0f}".format(
+            numberOfSymbols, len(cards), scan, tableRate, cyclicRate, vectorized))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import numpy as np
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import binary_matrices_generator as bmg
+
+
+# benchmark of the block assembly used inside the latin square backtracking
+# element by element implementations are kept below as the reference the vectorized ones must match
+def legacyApplySubMatrix(matrix, subMatrix, rowDisplacement, columnDisplacement):
+    size = len(subMatrix)
+
+    for innerRowLoop in range(size):
+        for innerColumnLoop in range(size):
+            rowIndex = innerRowLoop + rowDisplacement
+            columnIndex = innerColumnLoop + columnDisplacement
+            matrix[rowIndex][columnIndex] = subMatrix[innerRowLoop][innerColumnLoop]
+
+
+def legacyApplySubMatrices(matrix, subMatrices, assignments):
+    size = len(subMatrices)
+    subMatrixSize = len(subMatrices[0])
+    displacement = 2 * subMatrixSize + 1
+
+    for outerSubMatrixLoopRow in range(size):
+        for outerSubMatrixLoopColumn in range(size):
+            subMatrix = subMatrices[assignments[outerSubMatrixLoopRow][outerSubMatrixLoopColumn]]
+            rowDisplacement = outerSubMatrixLoopRow * subMatrixSize + displacement
+            columnDisplacement = outerSubMatrixLoopColumn * subMatrixSize + displacement
+            legacyApplySubMatrix(matrix, subMatrix, rowDisplacement, columnDisplacement)
+
+
+def legacyGenerateIdentityMatrix(size):
+    matrix = np.zeros((size, size), dtype=np.uint8)
+    for i in range(size):
+        matrix[i][i] = 1
+
+    return matrix
+
+
+def legacyApplyDiagonal(matrix, isReversed=False):
+    rangeOver = [0, 1] if not isReversed else [1, 0]
+    size = len(matrix)
+    newSize = 2 * size
+    newMatrix = np.zeros((newSize, newSize), dtype=np.uint8)
+
+    for quarterIterator in range(2):
+        horizontalQuarter = rangeOver[quarterIterator] * size
+        verticalQuarter = quarterIterator * size
+        for i in range(size):
+            for j in range(size):
+                newMatrix[verticalQuarter + i][horizontalQuarter + j] = matrix[i][j]
+
+    return newMatrix
+
+
+def legacyGenerateInitialMatrix(order):
+    numberOfSymbols = order * (order + 1) + 1
+    incidenceMatrix = np.zeros((numberOfSymbols, numberOfSymbols), dtype=np.int8)
+    iterationStartPoint = 1
+    incidenceMatrix[0][0] = 1
+    for i in range(order + 1):
+        for j in range(order):
+            incidenceMatrix[i][iterationStartPoint] = 1
+            incidenceMatrix[iterationStartPoint][i] = 1
+            iterationStartPoint += 1
+
+    identityMatrix = legacyGenerateIdentityMatrix(order)
+    identitySize = len(identityMatrix)
+
+    displacement = order + 1
+    for i in range(order):
+        legacyApplySubMatrix(incidenceMatrix, identityMatrix, i * identitySize + displacement, displacement)
+        legacyApplySubMatrix(incidenceMatrix, identityMatrix, displacement, i * identitySize + displacement)
+
+    return incidenceMatrix
+
+
+def cyclicSubMatrices(order):
+    # any set of order - 1 permutation blocks and a latin square of them exercises the assembly
+    blocks = np.zeros((order - 1, order, order), dtype=np.uint8)
+    for shift in range(order - 1):
+        blocks[shift] = np.roll(np.eye(order, dtype=np.uint8), shift + 1, axis=1)
+    assignments = (np.arange(order - 1)[:, None] + np.arange(order - 1)[None, :]) % (order - 1)
+
+    return blocks, assignments
+
+
+def assemble(order, generateInitialMatrix, applySubMatrices):
+    matrix = generateInitialMatrix(order)
+    blocks, assignments = cyclicSubMatrices(order)
+    applySubMatrices(matrix, blocks, assignments)
+    return matrix
+
+
+def verifyEquivalence(order):
+    legacy = assemble(order, legacyGenerateInitialMatrix, legacyApplySubMatrices)
+    vectorized = assemble(order, bmg.generateInitialMatrix, bmg.applySubMatrices)
+    if legacy.dtype != vectorized.dtype or not np.array_equal(legacy, vectorized):
+        raise AssertionError("Assembled matrices differ for order " + str(order))
+
+    legacyIdentity = legacyGenerateIdentityMatrix(order)
+    for isReversed in [False, True]:
+        if not np.array_equal(legacyApplyDiagonal(legacyIdentity, isReversed),
+                bmg.applyDiagonal(bmg.generateIdentityMatrix(order), isReversed)):
+            raise AssertionError("Diagonal matrices differ for order " + str(order))
+
+
+def bestTime(statement, repeat=5):
+    number, _ = timeit.Timer(statement).autorange()
+    return min(timeit.Timer(statement).repeat(repeat, number)) / number
+
+
+def main():
+    print("order  legacy [ms]  vectorized [ms]  speedup")
+    for order in range(2, 17):
+        verifyEquivalence(order)
+        legacy = bestTime(lambda: assemble(order, legacyGenerateInitialMatrix, legacyApplySubMatrices))
+        vectorized = bestTime(lambda: assemble(order, bmg.generateInitialMatrix, bmg.applySubMatrices))
+        print("{:5d}  {:11.3f}  {:15.3f}  {:6.1f}x".format(
+            order, legacy * 1000, vectorized * 1000, legacy / vectorized))
+
+
+if __name__ == "__main__":
+    main()
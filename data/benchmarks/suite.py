@@ -0,0 +1,220 @@
+import numpy as np
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+DATA_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DATA_DIRECTORY)
+
+import binary_matrices_generator as bmg
+import card_creator as cc
+import deck_writer as dw
+import field_projector as fp
+import finite_field_plane as ffp
+import latin_square_solver as lss
+import symbol_unravel as su
+
+
+# timings and peak memory of every stage of deck generation for plane orders from 2 to 16
+# every benchmark takes an order and returns the function to time, anything it needs is prepared beforehand
+# results are written as json named after the commit they were measured on, so two commits can be compared
+# python benchmarks/suite.py run
+# python benchmarks/suite.py run --stage displaceSymbolsOnCards unravelSymbols --orders 4 5 7
+# python benchmarks/suite.py compare benchmarks/results/<old commit>.json benchmarks/results/<new commit>.json
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+PLANE_ORDERS = [order for order in range(2, 17) if ffp.primePowerFactors(order) is not None]
+# from 14 symbols on the smallest symbol size card_creator allows doesn't fit on a card anymore
+CARD_ORDERS = [order for order in PLANE_ORDERS if order <= 11]
+# layout and unravel are timed on a fixed number of cards, so their times are per the same amount of work
+SAMPLED_CARDS = 8
+SEED = 0
+
+
+def initialMatrix(order):
+    return lambda: bmg.generateInitialMatrix(order)
+
+
+def evenSubMatrices(order):
+    return lambda: bmg.generateEvenSizeSubMatrices(order)
+
+
+def symmetricalSquare(order):
+    blocks = bmg.generateCyclicSubMatrices(order)
+    return lambda: lss.symmetricalLatinSquare(order - 1, blocks)
+
+
+def asymmetricalSquare(order):
+    blocks = bmg.generateEvenSizeSubMatrices(order) if order % 2 == 0 else bmg.generateCyclicSubMatrices(order)
+    return lambda: lss.asymmetricalLatinSquare(order - 1, blocks)
+
+
+def projection(order):
+    # without the cache, so the construction itself is timed
+    return lambda: fp.symbolProjection(order + 1, useCache=False)
+
+
+def planeDeck(order):
+    return lambda: fp.symbolDeck(order + 1, useCache=False)
+
+
+def streamedDeck(order):
+    # peak memory of this one stays O(q^2), compare it with symbolDeck
+    return lambda: sum(1 for _ in fp.streamCardSymbols(order + 1, "field"))
+
+
+def layout(order):
+    deck = fp.symbolDeck(order + 1)
+    cardIndices = range(min(SAMPLED_CARDS, len(deck)))
+    return lambda: cc.displaceSymbolsOnCards(order + 1, deck, SEED, cardIndices)
+
+
+def unravel(order):
+    # positions straight out of the layout, before they were moved apart
+    deck = fp.symbolDeck(order + 1)
+    cardList = cc.createSymbolLists(order + 1, deck, SEED, range(min(SAMPLED_CARDS, len(deck))))
+    cc.layoutWithBackend(cardList, order + 1, cc.layoutBackend)
+    cards = [[(list(symbol.coords), symbol.size) for symbol in symbolList] for symbolList in cardList]
+    return lambda: [su.unravelSymbols([su.Symbol(coords, size) for coords, size in card]) for card in cards]
+
+
+def export(order):
+    deck = fp.symbolDeck(order + 1)
+    cards = cc.cardsJSON(cc.displaceSymbolsOnCards(order + 1, deck, SEED, range(min(SAMPLED_CARDS, len(deck)))))
+    # the whole deck, made of copies of the laid out cards
+    cards = [cards[index % len(cards)] for index in range(len(deck))]
+
+    def write():
+        writer = dw.DeckWriter(io.StringIO())
+        writer.writeCards(order + 1, cards)
+        writer.close()
+    return write
+
+
+# stage name, function preparing the benchmark and orders it runs for
+# latin squares only for orders the ordered projection can use them for,
+# the asymmetrical one of order 16 runs for minutes and is left out
+STAGES = [
+    ("generateInitialMatrix", initialMatrix, list(range(2, 17))),
+    ("generateEvenSizeSubMatrices", evenSubMatrices, [2, 4, 8, 16]),
+    ("symmetricalLatinSquare", symmetricalSquare, [3, 5, 7, 11, 13]),
+    ("asymmetricalLatinSquare", asymmetricalSquare, [3, 4, 8]),
+    ("symbolProjection", projection, PLANE_ORDERS),
+    ("symbolDeck", planeDeck, PLANE_ORDERS),
+    ("streamCardSymbols", streamedDeck, PLANE_ORDERS),
+    ("displaceSymbolsOnCards", layout, CARD_ORDERS),
+    ("unravelSymbols", unravel, CARD_ORDERS),
+    ("export", export, CARD_ORDERS)
+]
+
+
+def bestTime(function, repeat):
+    number, _ = timeit.Timer(function).autorange()
+    return min(timeit.Timer(function).repeat(repeat, number)) / number
+
+
+def peakMemory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def commitName():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DATA_DIRECTORY, capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def runStages(stages=None, orders=None, repeat=3):
+    results = []
+    for name, prepare, stageOrders in STAGES:
+        if stages is not None and name not in stages:
+            continue
+        for order in stageOrders:
+            if orders is not None and order not in orders:
+                continue
+            function = prepare(order)
+            result = {"stage": name, "order": order, "seconds": bestTime(function, repeat),
+                "peakBytes": peakMemory(function)}
+            print("{stage:<28} {order:>5} {seconds:>12.6f} s {peakBytes:>12} B".format(**result))
+            results.append(result)
+    return results
+
+
+def saveResults(results, path=None):
+    commit = commitName()
+    if path is None:
+        os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+        path = os.path.join(RESULTS_DIRECTORY, commit + ".json")
+    with open(path, "w") as file:
+        json.dump({
+            "commit": commit,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "results": results
+        }, file, indent=4)
+    return path
+
+
+def compareResults(oldPath, newPath, threshold=1.2):
+    # prints ratios of new to old times and memory, returns stages slower than the threshold
+    with open(oldPath, "r") as file:
+        old = json.load(file)
+    with open(newPath, "r") as file:
+        new = json.load(file)
+    oldResults = {(result["stage"], result["order"]): result for result in old["results"]}
+    regressions = []
+    print("{:<28} {:>5} {:>10} {:>10}".format("stage", "order", "time", "memory"))
+    for result in new["results"]:
+        key = (result["stage"], result["order"])
+        if key not in oldResults:
+            continue
+        timeRatio = result["seconds"] / max(oldResults[key]["seconds"], 1e-12)
+        memoryRatio = result["peakBytes"] / max(oldResults[key]["peakBytes"], 1)
+        isSlower = timeRatio > threshold
+        if isSlower:
+            regressions.append(key)
+        print("{:<28} {:>5} {:>9.2f}x {:>9.2f}x{}".format(key[0], key[1], timeRatio, memoryRatio,
+            "  SLOWER" if isSlower else ""))
+    return regressions
+
+
+def parseArguments():
+    parser = argparse.ArgumentParser(description="Benchmark every stage of deck generation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="time stages and save results of the current commit")
+    run.add_argument("--stage", nargs="+", choices=[name for name, _, _ in STAGES], default=None)
+    run.add_argument("--orders", type=int, nargs="+", default=None)
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--output", default=None, help="defaults to benchmarks/results/<commit>.json")
+
+    compare = commands.add_parser("compare", help="compare results of two commits")
+    compare.add_argument("old")
+    compare.add_argument("new")
+    compare.add_argument("--threshold", type=float, default=1.2, help="ratio of times counted as a regression")
+    return parser.parse_args()
+
+
+def main():
+    arguments = parseArguments()
+    if arguments.command == "run":
+        results = runStages(arguments.stage, arguments.orders, arguments.repeat)
+        print("Saved into " + saveResults(results, arguments.output))
+    elif compareResults(arguments.old, arguments.new, arguments.threshold):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,49 +3,28 @@ import numpy as np
 
 def applySubMatrix(matrix, subMatrix, rowDisplacement, columnDisplacement):
     size = len(subMatrix)
-
-    for innerRowLoop in range(size):
-        for innerColumnLoop in range(size):
-            rowIndex = innerRowLoop + rowDisplacement
-            columnIndex = innerColumnLoop + columnDisplacement
-            matrix[rowIndex][columnIndex] = subMatrix[innerRowLoop][innerColumnLoop]
+    matrix[rowDisplacement:rowDisplacement + size, columnDisplacement:columnDisplacement + size] = subMatrix
 
 
 def applySubMatrices(matrix, subMatrices, assignments):
-    size = len(subMatrices)
+    size = len(assignments)
     subMatrixSize = len(subMatrices[0])
     displacement = 2 * subMatrixSize + 1
 
-    for outerSubMatrixLoopRow in range(size):
-        for outerSubMatrixLoopColumn in range(size):
-            subMatrix = subMatrices[assignments[outerSubMatrixLoopRow][outerSubMatrixLoopColumn]]
-            rowDisplacement = outerSubMatrixLoopRow * subMatrixSize + displacement
-            columnDisplacement = outerSubMatrixLoopColumn * subMatrixSize + displacement
-            applySubMatrix(matrix, subMatrix, rowDisplacement, columnDisplacement)
+    # gather every block at once and lay them out as a (size * subMatrixSize) square
+    blocks = np.asarray(subMatrices)[np.asarray(assignments)]
+    blocks = blocks.transpose(0, 2, 1, 3).reshape(size * subMatrixSize, size * subMatrixSize)
+    matrix[displacement:displacement + len(blocks), displacement:displacement + len(blocks)] = blocks
 
 
 def generateIdentityMatrix(size):
-    matrix = np.zeros((size, size), dtype=np.uint8)
-    for i in range(size):
-        matrix[i][i] = 1
-    
-    return matrix
+    return np.eye(size, dtype=np.uint8)
 
 
 def applyDiagonal(matrix, isReversed=False):
-    rangeOver = [0, 1] if not isReversed else [1, 0]
-    size = len(matrix)
-    newSize = 2 * size
-    newMatrix = np.zeros((newSize, newSize), dtype=np.uint8)
-    
-    for quarterIterator in range(2):
-        horizontalQuarter = rangeOver[quarterIterator] * size
-        verticalQuarter = quarterIterator * size
-        for i in range(size):
-            for j in range(size):
-                newMatrix[verticalQuarter + i][horizontalQuarter + j] = matrix[i][j]
-
-    return newMatrix
+    # copies of the matrix are placed either on the main or on the anti diagonal of a 2x2 block matrix
+    diagonal = np.asarray([[0, 1], [1, 0]] if isReversed else [[1, 0], [0, 1]], dtype=np.uint8)
+    return np.kron(diagonal, np.asarray(matrix, dtype=np.uint8))
 
 
 def generateInitialMatrix(order):
@@ -53,25 +32,20 @@ def generateInitialMatrix(order):
     numberOfSymbols = order * (order + 1) + 1
     # number of symbols by number of cards
     incidenceMatrix = np.zeros((numberOfSymbols, numberOfSymbols), dtype=np.int8)
-    iterationStartPoint = 1
     incidenceMatrix[0][0] = 1
     # fill in A0i and Ai0 sub-matrices with column/row i filled with all ones
     # first rows and columns are filled accordingly to the +1 of k^2 + k + 1 symbols
-    for i in range(order + 1):
-        for j in range(order):
-            incidenceMatrix[i][iterationStartPoint] = 1
-            incidenceMatrix[iterationStartPoint][i] = 1
-            iterationStartPoint += 1
-    
-    identityMatrix = generateIdentityMatrix(order)
-    identitySize = len(identityMatrix)
+    lineIndices = np.repeat(np.arange(order + 1), order)
+    pointIndices = np.arange(1, numberOfSymbols)
+    incidenceMatrix[lineIndices, pointIndices] = 1
+    incidenceMatrix[pointIndices, lineIndices] = 1
 
     # fill in A1i and Ai1 sub-matrices as identity matrix
     displacement = order + 1
-    for i in range(order):
-        applySubMatrix(incidenceMatrix, identityMatrix, i * identitySize + displacement, displacement)
-        applySubMatrix(incidenceMatrix, identityMatrix, displacement, i * identitySize + displacement)
-    
+    identityMatrix = generateIdentityMatrix(order)
+    incidenceMatrix[displacement:, displacement:displacement + order] = np.tile(identityMatrix, (order, 1))
+    incidenceMatrix[displacement:displacement + order, displacement:] = np.tile(identityMatrix, (1, order))
+
     return incidenceMatrix
 
 
@@ -99,6 +73,20 @@ def generateEvenSizeSubMatrices(size):
     return np.asarray(currentSubMatrices, dtype=np.uint8)
 
 
+def generateCyclicSubMatrices(order):
+    # sub-matrix i has its ones on the diagonal shifted by i + 1 rows, used for odd orders
+    subMatrices = np.zeros((order - 1, order, order), dtype=np.uint8)
+    blockShift = -1
+    for i in range(order - 1):
+        rowIterator = blockShift % order
+        for j in range(order):
+            subMatrices[i][rowIterator][j] = 1
+            rowIterator = (rowIterator + 1) % order
+        blockShift -= 1
+
+    return subMatrices
+
+
 if __name__ == "main":
     print("Script to be used only in tandem with another one")
 
@@ -0,0 +1,148 @@
+import numpy as np
+import ast
+import hashlib
+import json
+import os
+
+import deck_writer as dw
+import matrix_cache as mc
+
+
+# manifest of a generated deck file, used to rebuild only the cards whose inputs have changed
+# a card depends on the seed, its number of symbols and index, the symbols it holds (its row of deck.cardSymbols),
+# layout options and the code of the layout itself, so all of them go into its hash
+# the deck hash covers symbols of every card on top of that and tells if anything in the deck has to be looked at
+# format and precision of the output aren't part of the hashes, a build changing either of them lays out every card
+MANIFEST_VERSION = 1
+# files with the code of the layout, None hashes the whole file, a list only those top level definitions of it
+# so editing the command line or the writing of decks in card_creator doesn't make every card stale
+LAYOUT_SOURCES = {
+    "card_creator.py": ["SQRT_2", "MIN_SYMBOL_SIZE", "Symbol", "cardsJSON", "checkContainment", "repulsionVector",
+        "applyRepulsionForces", "applyAttractionForces", "deckSeedSequence", "cardGenerator", "baseSymbolSize",
+        "createSymbolLists", "layoutSymbols", "symbolArrays", "updateCoords", "layoutCardsAtOnce", "layoutWithKernels",
+        "layoutWithBackend", "layoutOptions", "displaceSymbolsOnCards"],
+    "batched_layout.py": None,
+    "layout_kernels.py": None,
+    "symbol_unravel.py": None,
+    "geometric_unravel.py": None
+}
+SOURCE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def manifestPath(outputPath):
+    return outputPath + ".manifest.json"
+
+
+def digest(*parts):
+    hash = hashlib.sha256()
+    for part in parts:
+        hash.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True).encode())
+        hash.update(b"\0")
+    return hash.hexdigest()
+
+
+def definitionNames(node):
+    if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+        return [node.name]
+    if isinstance(node, ast.Assign):
+        return [target.id for target in node.targets if isinstance(target, ast.Name)]
+    return []
+
+
+def layoutSource(fileName, names):
+    with open(os.path.join(SOURCE_DIRECTORY, fileName), "r") as file:
+        source = file.read()
+    if names is None:
+        return source
+    definitions = {}
+    for node in ast.parse(source).body:
+        for name in definitionNames(node):
+            definitions[name] = ast.get_source_segment(source, node)
+    return "\n".join(definitions[name] for name in names)
+
+
+def codeVersion():
+    # tweaking a force constant changes the source, which is enough to mark every card as stale
+    hash = hashlib.sha256()
+    for fileName, names in LAYOUT_SOURCES.items():
+        hash.update(fileName.encode() + b"\0" + layoutSource(fileName, names).encode())
+    return hash.hexdigest()
+
+
+def cardSymbolsHash(cardSymbols):
+    cardSymbols = np.asarray(cardSymbols, dtype="<i4")
+    return digest(list(cardSymbols.shape), cardSymbols.tobytes())
+
+
+def deckHash(symbols, cardSymbols, seed, options, version):
+    return digest(symbols, cardSymbolsHash(cardSymbols), str(seed), options, version)
+
+
+def cardHash(shared, index, symbolsOfCard):
+    return digest(shared, index, [int(symbol) for symbol in symbolsOfCard])
+
+
+def cardHashes(symbols, cardSymbols, seed, options, version):
+    shared = digest(symbols, str(seed), options, version)
+    return [cardHash(shared, index, cardSymbols[index]) for index in range(len(cardSymbols))]
+
+
+def streamedHashes(symbols, cards, cardCount, seed, options, version):
+    # deckHash and cardHashes of cards coming one at a time, none of them is kept
+    # cardSymbolsHash digests the shape before the symbols, so the number of cards has to be known up front
+    symbolsHash = hashlib.sha256()
+    symbolsHash.update(json.dumps([cardCount, symbols]).encode() + b"\0")
+    shared = digest(symbols, str(seed), options, version)
+    hashes = []
+    for index, symbolsOfCard in enumerate(cards):
+        symbolsHash.update(np.asarray(symbolsOfCard, dtype="<i4").tobytes())
+        hashes.append(cardHash(shared, index, symbolsOfCard))
+    symbolsHash.update(b"\0")
+    return digest(symbols, symbolsHash.hexdigest(), str(seed), options, version), hashes
+
+
+def loadManifest(outputPath):
+    path = manifestPath(outputPath)
+    if not os.path.exists(path) or not os.path.exists(outputPath):
+        return None
+    with open(path, "r") as file:
+        manifest = json.load(file)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def saveManifest(outputPath, manifest):
+    mc.replaceFile(manifestPath(outputPath), lambda file: json.dump(dict(manifest, version=MANIFEST_VERSION), file,
+        indent=4))
+
+
+def isSameEncoding(manifest, format, precision):
+    # cards of the previous output can only be reused when they were written the very same way,
+    # rounded floats of the compact formats can't be turned back into the ones of a full build
+    return manifest.get("format") == format and manifest.get("precision") == precision
+
+
+def loadDecks(outputPath, format):
+    with open(outputPath, "r") as file:
+        if format == "ndjson":
+            return list(dw.readDecks(file))
+        return json.load(file)
+
+
+def staleCards(manifest, symbols, expectedDeckHash, expectedCardHashes):
+    # indices of cards that have to be laid out again, every one of them if the deck wasn't built before
+    if manifest is None:
+        return list(range(len(expectedCardHashes)))
+    entry = next((deck for deck in manifest["decks"] if deck["symbols"] == symbols), None)
+    if entry is None:
+        return list(range(len(expectedCardHashes)))
+    if entry["hash"] == expectedDeckHash:
+        return []
+    builtHashes = entry["cards"]
+    return [index for index, cardHash in enumerate(expectedCardHashes)
+        if index >= len(builtHashes) or builtHashes[index] != cardHash]
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
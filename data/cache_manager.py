@@ -0,0 +1,59 @@
+import argparse
+
+from field_projector import symbolDeck
+import latin_square_solver as lss
+import matrix_cache as mc
+
+
+# command line access to the matrix cache
+# python cache_manager.py warm 5 6 8 --method singer
+# python cache_manager.py warm 8 --method ordered --workers 8
+# python cache_manager.py list
+# python cache_manager.py evict --order 8
+def warm(symbolsOnCard, method):
+    for numberOfSymbols in symbolsOnCard:
+        if symbolDeck(numberOfSymbols, method) is None:
+            print("No projective plane for " + str(numberOfSymbols) + " symbols on a card, skipped")
+
+    printEntries()
+
+
+def printEntries():
+    for entry in mc.listEntries():
+        print("{key:<45} {bytes:>10} B  {shape}  {dtype}  {sha256}".format(**entry))
+
+
+def parseArguments():
+    parser = argparse.ArgumentParser(description="Manage cached incidence matrices and latin squares")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    warmCommand = commands.add_parser("warm", help="build and cache planes for given numbers of symbols on a card")
+    warmCommand.add_argument("symbols", type=int, nargs="+")
+    warmCommand.add_argument("--method", choices=["ordered", "field", "singer"], default=None)
+    warmCommand.add_argument("--workers", type=int, default=1,
+        help="processes racing randomized latin square searches of the ordered method, only squares of the plain search are cached")
+
+    commands.add_parser("list", help="list cached entries")
+
+    evictCommand = commands.add_parser("evict", help="remove entries matching all given filters")
+    evictCommand.add_argument("--kind", choices=["incidence", "deck", "latin"], default=None)
+    evictCommand.add_argument("--order", type=int, default=None)
+    evictCommand.add_argument("--method", default=None)
+
+    return parser.parse_args()
+
+
+def main():
+    arguments = parseArguments()
+    if arguments.command == "warm":
+        lss.portfolioWorkers = arguments.workers
+        warm(arguments.symbols, arguments.method)
+    elif arguments.command == "list":
+        printEntries()
+    else:
+        evicted = mc.evictEntries(arguments.kind, arguments.order, arguments.method)
+        print("Evicted " + str(len(evicted)) + " entries")
+
+
+if __name__ == "__main__":
+    main()
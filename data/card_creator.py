@@ -1,10 +1,24 @@
 import numpy as np
-import random
 import math
 import json
-
-from field_projector import symbolProjection
+import argparse
+import os
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from field_projector import symbolDeck, streamCardSymbols
+import deck as dk
 import symbol_unravel as su
+import geometric_unravel as gu
+import batched_layout as bl
+import layout_kernels as lk
+import deck_writer as dw
+import deck_binary as db
+import build_manifest as bm
+import match_index as mi
+import matrix_cache as mc
+import instrumentation as ins
 
 # script used to generate data for different versions of a game of searching for a pair between two cards
 # be careful with a number of symbols; not only is it hard to see, but you will get MANY cards
@@ -12,13 +26,28 @@ import symbol_unravel as su
 # while number of cards can be lowered, the number of symbols provided MUST be equal to given number of cards
 # number of symbols on a card minus one SHOULD be a power of prime number (even power of 1 will suffice) otherwise it won't work
 symbolsOnCard = range(5, 11) # having 12 symbols on a card WILL make it unreadable, going beyond 10 is not advised
+# None picks the default construction for each order, "field" or "singer" force the given one
+projectionMethod = None
+# "numpy" lays out all cards of a deck at once with array operations, "object" moves symbol objects one by one
+# "python" and "numba" run the plain loops of layout_kernels, the latter compiled when numba is installed
+layoutBackend = "numpy"
+# "raster" moves symbols on a 100x100 grid, "geometric" pushes exact boxes apart
+unravelMethod = "raster"
+# how the annealing temperature falls, "linear", "exponential" or "adaptive"
+coolingSchedule = "linear"
 SQRT_2 = math.sqrt(2)
+# smallest size a symbol is drawn with, cards with 14 or more symbols have no room left above it
+MIN_SYMBOL_SIZE = 15
 
 class Symbol:
-    def __init__(self, symbolNumber, baseSize):
+    def __init__(self, symbolNumber, baseSize, generator=None):
+        if generator is None:
+            generator = np.random.default_rng()
         self.symbolNumber = symbolNumber
-        self.size = random.randint(15, baseSize)
-        self.coords = np.array([random.random() * 90 - 45, random.random() * 90 - 45], dtype=np.float64)
+        self.size = int(generator.integers(MIN_SYMBOL_SIZE, baseSize, endpoint=True))
+        self.coords = np.array([generator.random() * 90 - 45, generator.random() * 90 - 45], dtype=np.float64)
+        # drawn together with the rest, so a card depends only on its own generator
+        self.rotation = round(float(generator.random()) * 360, 2)
         self.disp = np.array([0, 0], dtype=np.float64)
 
     def clampCoords(self):
@@ -56,7 +85,7 @@ class Symbol:
             "size": self.size,
             "horizontal": self.coords[0],
             "vertical": self.coords[1],
-            "rotation": round(random.random() * 360, 2)
+            "rotation": self.rotation
         }
         return jsonObject
 
@@ -162,74 +191,465 @@ def applyAttractionForces(symbol, symbol2, kParameter, divisor):
     symbol2.disp -= distance * length ** 2 / kParameter * forceModifierConstant
 
 
-def displaceSymbolsOnCards(symbols, matrix):
-    baseSize = math.floor(50 * 
-        (1 - math.tan(symbols * math.pi / (4 * (symbols + 2))) ** 2)) - 2
-    divisor = math.sqrt(symbols)
+def newSeed():
+    return int(np.random.SeedSequence().entropy)
+
+
+def deckSeedSequence(seed, symbols):
+    # each deck is keyed by its number of symbols rather than its position, so adding a deck doesn't change others
+    return np.random.SeedSequence(seed, spawn_key=(symbols,))
+
+
+def cardGenerator(seed, symbols, cardIndex):
+    # every card gets its own generator, so it doesn't matter which process lays it out or in what order
+    # built the same way as deckSeedSequence(seed, symbols).spawn(cards)[cardIndex], without spawning all of them
+    deckSequence = deckSeedSequence(seed, symbols)
+    cardSequence = np.random.SeedSequence(deckSequence.entropy, spawn_key=deckSequence.spawn_key + (cardIndex,))
+    return np.random.default_rng(cardSequence)
+
+
+def baseSymbolSize(symbols):
+    # largest size a symbol is drawn with, the more symbols share a card the smaller they get
+    return math.floor(50 * (1 - math.tan(symbols * math.pi / (4 * (symbols + 2))) ** 2)) - 2
+
+
+def createSymbolLists(symbols, deck, seed=None, cardIndices=None):
+    baseSize = baseSymbolSize(symbols)
+    if cardIndices is None:
+        cardIndices = range(len(deck))
+    if seed is None:
+        seed = newSeed()
     cardList = []
-    # column is representative of a single card
-    for columnIndex in range(len(matrix)):
+    # symbols of a card are sorted, the same order a scan down its column of the incidence matrix gave
+    for cardIndex in cardIndices:
+        generator = cardGenerator(seed, symbols, cardIndex)
         symbolList = []
-        for rowIndex in range(len(matrix)):
-            if matrix[rowIndex][columnIndex]:
-                symbolList.append(Symbol(rowIndex, baseSize))
-
-        # Fruchterman and Reingold force directed graph drawing algorithm
-        # assuming all the vertices are connected by invisible edges with previous and next one
-        kParameter = math.sqrt(10000 / symbols)
-        # temperature for simulated annealing
-        temperatureC = 15
-        # arbitrarily chosen number of loops
-        iterations = 50
-        temperatureCooling = temperatureC / iterations
-        for loop in range(iterations):
-            for symbol in symbolList:
-                for symbol2 in symbolList:
-                    if symbol != symbol2:
-                        applyRepulsionForces(symbol, symbol2, kParameter, divisor)
+        for symbolNumber in deck.symbolsOf(cardIndex):
+            symbolList.append(Symbol(int(symbolNumber), baseSize, generator))
+        cardList.append(symbolList)
+    return cardList
 
-            # we assume each element is connected with the next one in a circular way
-            for i in range(len(symbolList)):
-                idx = (i + 1) % len(symbolList)
-                applyAttractionForces(symbolList[i], symbolList[idx], kParameter, divisor)
 
-            # we assume the first element is also connected to every other element
-            for i in range(2, len(symbolList) - 1):
-                applyAttractionForces(symbolList[0], symbolList[i], kParameter, divisor)
+def layoutSymbols(symbolList, symbols, cooling="linear", tolerance=None):
+    divisor = math.sqrt(symbols)
+    # Fruchterman and Reingold force directed graph drawing algorithm
+    # assuming all the vertices are connected by invisible edges with previous and next one
+    kParameter = math.sqrt(10000 / symbols)
+    # temperature for simulated annealing
+    temperatureC = 15
+    # arbitrarily chosen number of loops
+    iterations = 50
+    startTemperature = temperatureC
+    progress = 0
+    previousEnergy = math.inf
+    for loop in range(iterations):
+        for symbol in symbolList:
+            for symbol2 in symbolList:
+                if symbol != symbol2:
+                    applyRepulsionForces(symbol, symbol2, kParameter, divisor)
 
-            # and so is the second one
-            for i in range(3, len(symbolList)):
-                applyAttractionForces(symbolList[1], symbolList[i], kParameter, divisor)
+        # we assume each element is connected with the next one in a circular way
+        for i in range(len(symbolList)):
+            idx = (i + 1) % len(symbolList)
+            applyAttractionForces(symbolList[i], symbolList[idx], kParameter, divisor)
 
-            for symbol in symbolList:
-                dispLength = np.linalg.norm(symbol.disp)
-                if dispLength != 0:
-                    symbol.coords += symbol.disp / dispLength * min(dispLength, temperatureC)
-                    symbol.clampCoords()
-                symbol.disp = np.array([0, 0], dtype=np.float64)
+        # we assume the first element is also connected to every other element
+        for i in range(2, len(symbolList) - 1):
+            applyAttractionForces(symbolList[0], symbolList[i], kParameter, divisor)
 
-            temperatureC -= temperatureCooling
+        # and so is the second one
+        for i in range(3, len(symbolList)):
+            applyAttractionForces(symbolList[1], symbolList[i], kParameter, divisor)
 
-        wrappedSymbols = []
+        energy = 0
+        largestMove = 0
         for symbol in symbolList:
-            unravellingSymbol = su.Symbol(symbol.coords, symbol.size)
-            wrappedSymbols.append(unravellingSymbol)
-        newCoords = su.unravelSymbols(wrappedSymbols)
-        for idx in range(len(newCoords)):
-            symbolList[idx].coords = newCoords[idx].tolist()
+            dispLength = np.linalg.norm(symbol.disp)
+            if dispLength != 0:
+                previousCoords = symbol.coords.copy()
+                symbol.coords += symbol.disp / dispLength * min(dispLength, temperatureC)
+                symbol.clampCoords()
+                # measured after clamping, symbols pushed against the edge of the card don't move at all
+                largestMove = max(largestMove, np.linalg.norm(symbol.coords - previousCoords))
+            energy += dispLength * dispLength
+            symbol.disp = np.array([0, 0], dtype=np.float64)
+
+        temperatureC, progress = bl.coolTemperature(cooling, temperatureC, startTemperature, iterations, energy,
+            previousEnergy, progress)
+        previousEnergy = energy
+        # the card settled down, further iterations would barely move anything
+        if tolerance is not None and largestMove < tolerance:
+            return loop + 1
+
+    return iterations
+
+
+def symbolArrays(cardList):
+    coords = np.array([[symbol.coords for symbol in symbolList] for symbolList in cardList], dtype=np.float64)
+    sizes = np.array([[symbol.size for symbol in symbolList] for symbolList in cardList])
+    numbers = np.array([[symbol.symbolNumber for symbol in symbolList] for symbolList in cardList])
+    return coords, sizes, numbers
+
+
+def updateCoords(cardList, coords):
+    for symbolList, cardCoords in zip(cardList, coords):
+        for symbol, symbolCoords in zip(symbolList, cardCoords):
+            symbol.coords = symbolCoords
+
+
+def layoutCardsAtOnce(cardList, symbols, cooling="linear", tolerance=None):
+    # same algorithm as layoutSymbols, but every card of the deck is moved in the same array operations
+    coords, sizes, numbers = symbolArrays(cardList)
+    coords, iterationCounts = bl.annealCards(coords, sizes, numbers, symbols, cooling=cooling, tolerance=tolerance)
+    updateCoords(cardList, coords)
+    return iterationCounts
+
+
+def layoutWithKernels(cardList, symbols, backend, cooling="linear", tolerance=None):
+    coords, sizes, numbers = symbolArrays(cardList)
+    coords, iterationCounts = lk.annealCards(coords, sizes, numbers, symbols, cooling=cooling, tolerance=tolerance,
+        backend=backend)
+    updateCoords(cardList, coords)
+    return iterationCounts
+
+
+def layoutWithBackend(cardList, symbols, backend, cooling="linear", tolerance=None):
+    # returns the number of iterations every card took
+    if backend == "numpy":
+        return layoutCardsAtOnce(cardList, symbols, cooling, tolerance)
+    if backend == "object":
+        return np.array([layoutSymbols(symbolList, symbols, cooling, tolerance) for symbolList in cardList])
+    return layoutWithKernels(cardList, symbols, backend, cooling, tolerance)
+
+
+def layoutOptions(**changes):
+    # settings of the layout, passed along with every chunk of cards to the processes laying them out
+    # tolerance of None always runs every iteration, otherwise a card stops once no symbol moves by that much
+    options = {"backend": layoutBackend, "unravel": unravelMethod, "cooling": coolingSchedule, "tolerance": None}
+    options.update(changes)
+    return options
+
+
+def displaceSymbolsOnCards(symbols, deck, seed=None, cardIndices=None, options=None, report=None):
+    # report, when given, gets the number of iterations and the overlap left by the layout of every card
+    options = layoutOptions(**(options or {}))
+    if cardIndices is None:
+        cardIndices = range(len(deck))
+    with ins.timer("symbols"):
+        cardList = createSymbolLists(symbols, deck, seed, cardIndices)
+    with ins.timer("layout"):
+        iterationCounts = layoutWithBackend(cardList, symbols, options["backend"], options["cooling"],
+            options["tolerance"])
+    ins.count("cards", len(cardList))
+    ins.count("layoutIterations", int(np.sum(iterationCounts)))
+    if report is not None:
+        coords, sizes, numbers = symbolArrays(cardList)
+        energies = bl.overlapEnergy(coords, sizes)
+        for cardIndex, iterationCount, energy in zip(cardIndices, iterationCounts, energies):
+            report.append({"symbols": symbols, "card": int(cardIndex), "iterations": int(iterationCount),
+                "energy": round(float(energy), 2)})
+
+    with ins.timer("unravel"):
+        for symbolList in cardList:
+            wrappedSymbols = []
+            for symbol in symbolList:
+                unravellingSymbol = su.Symbol(symbol.coords, symbol.size)
+                wrappedSymbols.append(unravellingSymbol)
+            if options["unravel"] == "geometric":
+                newCoords = gu.unravelSymbols(wrappedSymbols)
+            else:
+                newCoords = su.unravelSymbols(wrappedSymbols)
+            for idx in range(len(newCoords)):
+                symbolList[idx].coords = newCoords[idx].tolist()
 
-        cardList.append(symbolList)
     return cardList
 
 
-with open('GameTypes.json', 'w') as file:
-    jsonList = []
+def generateCards(task):
+    # the instrumentation report of the chunk is None unless the task asks for it
+    symbols, deck, seed, cardIndices, options, instrumentation = task
+    report = []
+    with ins.recording(instrumentation) as recorder:
+        cards = cardsJSON(displaceSymbolsOnCards(symbols, deck, seed, cardIndices, options, report))
+    return cards, report, None if recorder is None else recorder.report
+
+
+def cardTasks(symbolsOnCard, seed, method, chunkSize, options, selectedCards=None, instrumentation=None, stats=None):
+    # selectedCards maps a number of symbols to indices of cards to lay out, None means every card
     for numberOfSymbols in symbolsOnCard:
-        matrix = symbolProjection(numberOfSymbols)  
-        if matrix is not None:
-            jsonList.append({
-                "symbols": numberOfSymbols,
-                "cards": cardsJSON(displaceSymbolsOnCards(numberOfSymbols, matrix))
-            })
-    json.dump(jsonList, file, indent=4)
+        with ins.recordingInto(stats, numberOfSymbols, instrumentation):
+            deck = symbolDeck(numberOfSymbols, method)
+        if deck is None:
+            continue
+        # the deck is pickled for every chunk, which is cheap since it only holds q + 1 symbols per card
+        indices = range(len(deck)) if selectedCards is None else selectedCards.get(numberOfSymbols, [])
+        for start in range(0, len(indices), chunkSize):
+            cardIndices = indices[start:start + chunkSize]
+            yield (numberOfSymbols, deck, seed, cardIndices, options, instrumentation)
+
+
+def iterateCards(symbolsOnCard, workers=1, seed=None, method=None, chunkSize=16, options=None, selectedCards=None,
+        instrumentation=None, stats=None):
+    # cards of every deck are split into chunks laid out by separate processes
+    # with a given seed the result is the same for any number of workers and any chunk size
+    # chunks come back in order as (number of symbols, card indices, list of cards, layout report)
+    # as soon as they are ready
+    # with instrumentation settings, stats gets a merged instrumentation report of every deck
+    if seed is None:
+        seed = newSeed()
+
+    tasks = cardTasks(symbolsOnCard, seed, method, chunkSize, layoutOptions(**(options or {})), selectedCards,
+        instrumentation, stats)
+    yield from laidOutChunks(tasks, workers, stats)
+
+
+def streamedCardTasks(symbolsOnCard, seed, method, chunkSize, options, instrumentation=None, stats=None):
+    # chunks of cards taken straight from the plane construction, no deck is ever built as a whole
+    for numberOfSymbols in symbolsOnCard:
+        cards = streamCardSymbols(numberOfSymbols, method)
+        if cards is None:
+            continue
+        start = 0
+        while True:
+            with ins.recordingInto(stats, numberOfSymbols, instrumentation):
+                chunk = list(itertools.islice(cards, chunkSize))
+            if not chunk:
+                break
+            deck = dk.PartialDeck(start, chunk)
+            yield (numberOfSymbols, deck, seed, deck.cardIndices(), options, instrumentation)
+            start += len(chunk)
+
+
+def iterateStreamedCards(symbolsOnCard, workers=1, seed=None, method=None, chunkSize=16, options=None,
+        instrumentation=None, stats=None):
+    # the same chunks as iterateCards, for decks too large to keep in memory
+    # cards of a deck are read from the plane construction as they are laid out, so memory stays O(q^2)
+    if seed is None:
+        seed = newSeed()
+
+    tasks = streamedCardTasks(symbolsOnCard, seed, method, chunkSize, layoutOptions(**(options or {})),
+        instrumentation, stats)
+    yield from laidOutChunks(tasks, workers, stats)
+
+
+def laidOutChunks(tasks, workers, stats):
+    # tasks are only taken once there is room for them, two chunks per worker are laid out or waiting at a time
+    if workers == 1:
+        for task in tasks:
+            yield finishedChunk(task, generateCards(task), stats)
+        return
 
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append((task, executor.submit(generateCards, task)))
+            if len(pending) >= 2 * workers:
+                task, future = pending.popleft()
+                yield finishedChunk(task, future.result(), stats)
+        while pending:
+            task, future = pending.popleft()
+            yield finishedChunk(task, future.result(), stats)
+
+
+def finishedChunk(task, result, stats):
+    cards, report, chunkStats = result
+    if chunkStats is not None and stats is not None:
+        ins.mergeReports(stats.setdefault(task[0], ins.emptyReport()), chunkStats)
+    return task[0], task[3], cards, report
+
+
+def generateDecks(symbolsOnCard, workers=1, seed=None, method=None, chunkSize=16, options=None):
+    decks = []
+    for numberOfSymbols, cardIndices, cards, report in iterateCards(symbolsOnCard, workers, seed, method, chunkSize,
+            options):
+        if not decks or decks[-1]["symbols"] != numberOfSymbols:
+            decks.append({"symbols": numberOfSymbols, "cards": []})
+        decks[-1]["cards"].extend(cards)
+    return decks
+
+
+def openWriters(file, format, precision, binaryFile):
+    writers = [dw.DeckWriter(file, format, precision)]
+    if binaryFile is not None:
+        # unravelled coordinates are whole numbers within the card, so they always fit into uint8
+        writers.append(db.BinaryDeckWriter(binaryFile))
+    return writers
+
+
+def writeReport(reportFile, report):
+    if reportFile is not None:
+        for entry in report:
+            reportFile.write(json.dumps(entry) + "\n")
+
+
+def writeStats(statsFile, stats):
+    # a line with the merged instrumentation report of every deck, with only the top of its profile
+    if statsFile is not None:
+        for symbols, report in stats.items():
+            if "profile" in report:
+                report = dict(report, profile=ins.topEntries(report["profile"]))
+            statsFile.write(json.dumps(dict(report, symbols=symbols)) + "\n")
+
+
+def writeDecks(file, symbolsOnCard, workers=1, seed=None, method=None, chunkSize=16, options=None,
+        format="pretty", precision=2, binaryFile=None, reportFile=None, statsFile=None, instrumentation=None,
+        streaming=False):
+    # instrumentation settings of instrumentation.settings(), reports are written into statsFile
+    # streaming lays out cards as the plane construction yields them, giving the same output with O(q^2) memory
+    stats = {}
+    writers = openWriters(file, format, precision, binaryFile)
+    if streaming:
+        chunks = iterateStreamedCards(symbolsOnCard, workers, seed, method, chunkSize, options, instrumentation, stats)
+    else:
+        chunks = iterateCards(symbolsOnCard, workers, seed, method, chunkSize, options, None, instrumentation, stats)
+    for numberOfSymbols, cardIndices, cards, report in chunks:
+        with ins.recordingInto(stats, numberOfSymbols, instrumentation), ins.timer("export"):
+            for writer in writers:
+                writer.writeCards(numberOfSymbols, cards)
+        writeReport(reportFile, report)
+    for writer in writers:
+        writer.close()
+    writeStats(statsFile, stats)
+
+
+def buildManifest(symbolsOnCard, seed, method, options, format, precision=2, streaming=False):
+    # streaming hashes cards straight from the plane construction, the manifest is the same
+    options = layoutOptions(**(options or {}))
+    version = bm.codeVersion()
+    decks = []
+    for numberOfSymbols in symbolsOnCard:
+        if streaming:
+            cards = streamCardSymbols(numberOfSymbols, method, verify=False)
+            if cards is None:
+                continue
+            cardCount = (numberOfSymbols - 1) * numberOfSymbols + 1
+            deckHash, cardHashes = bm.streamedHashes(numberOfSymbols, cards, cardCount, seed, options, version)
+        else:
+            deck = symbolDeck(numberOfSymbols, method)
+            if deck is None:
+                continue
+            deckHash = bm.deckHash(numberOfSymbols, deck.cardSymbols, seed, options, version)
+            cardHashes = bm.cardHashes(numberOfSymbols, deck.cardSymbols, seed, options, version)
+        decks.append({"symbols": numberOfSymbols, "hash": deckHash, "cards": cardHashes})
+    return {"seed": str(seed), "method": method, "options": options, "format": format, "precision": precision,
+        "decks": decks}
+
+
+def rebuildDecks(outputPath, symbolsOnCard, workers=1, seed=None, method=None, chunkSize=16, options=None,
+        format="pretty", precision=2, binaryFile=None, reportFile=None, statsFile=None, instrumentation=None):
+    # lays out only the cards whose hash differs from the manifest and splices them into the existing decks
+    previous = bm.loadManifest(outputPath)
+    if seed is None:
+        seed = int(previous["seed"]) if previous is not None else newSeed()
+    manifest = buildManifest(symbolsOnCard, seed, method, options, format, precision)
+    if previous is not None and not bm.isSameEncoding(previous, format, precision):
+        previous = None
+
+    builtDecks = {}
+    if previous is not None:
+        builtDecks = {deck["symbols"]: deck["cards"] for deck in bm.loadDecks(outputPath, previous["format"])}
+    selectedCards = {}
+    for deck in manifest["decks"]:
+        stale = bm.staleCards(previous, deck["symbols"], deck["hash"], deck["cards"])
+        builtCards = builtDecks.get(deck["symbols"], [])
+        # cards missing from the output itself have to be made again, whatever the manifest says
+        missing = [index for index in range(len(deck["cards"])) if index >= len(builtCards)]
+        selectedCards[deck["symbols"]] = sorted(set(stale) | set(missing))
+
+    newCards = {}
+    stats = {}
+    for numberOfSymbols, cardIndices, cards, report in iterateCards(symbolsOnCard, workers, seed, method, chunkSize,
+            options, selectedCards, instrumentation, stats):
+        newCards.update({(numberOfSymbols, index): card for index, card in zip(cardIndices, cards)})
+        writeReport(reportFile, report)
+
+    def write(file):
+        writers = openWriters(file, format, precision, binaryFile)
+        for deck in manifest["decks"]:
+            symbols = deck["symbols"]
+            cards = [newCards.get((symbols, index)) or builtDecks[symbols][index] for index in range(len(deck["cards"]))]
+            with ins.recordingInto(stats, symbols, instrumentation), ins.timer("export"):
+                for writer in writers:
+                    writer.writeCards(symbols, cards)
+        for writer in writers:
+            writer.close()
+    mc.replaceFile(outputPath, write)
+    writeStats(statsFile, stats)
+    bm.saveManifest(outputPath, manifest)
+    return len(newCards)
+
+
+def parseArguments():
+    parser = argparse.ArgumentParser(description="Generate decks of cards for the game of finding a pair")
+    parser.add_argument("symbols", type=int, nargs="*", default=list(symbolsOnCard),
+        help="numbers of symbols on a card, one deck for each")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=None, help="same seed gives the same decks")
+    parser.add_argument("--method", choices=["ordered", "field", "singer"], default=projectionMethod)
+    parser.add_argument("--chunk-size", type=int, default=16, help="number of cards laid out by a single task")
+    parser.add_argument("--backend", choices=lk.BACKENDS, default=layoutBackend, help="implementation of the layout")
+    parser.add_argument("--unravel", choices=["raster", "geometric"], default=unravelMethod,
+        help="how overlapping symbols are moved apart")
+    parser.add_argument("--output", default="GameTypes.json")
+    parser.add_argument("--format", choices=dw.FORMATS, default="pretty",
+        help="pretty is the same as json.dump with indent of 4, ndjson writes a deck per line")
+    parser.add_argument("--precision", type=int, default=2, help="decimal places of floats in compact formats")
+    parser.add_argument("--binary", default=None, help="also write decks into a memory mappable binary file")
+    parser.add_argument("--cooling", choices=bl.COOLING_SCHEDULES, default=coolingSchedule)
+    parser.add_argument("--tolerance", type=float, default=None,
+        help="stop laying out a card once none of its symbols moves by this much in an iteration")
+    parser.add_argument("--report", default=None,
+        help="write iterations and overlap energy left by the layout of every card into this ndjson file")
+    parser.add_argument("--incremental", action="store_true",
+        help="lay out only cards whose inputs changed since the last build of the output file")
+    parser.add_argument("--matches", default=None,
+        help="also write the symbol shared by every pair of cards of each deck into this json file")
+    parser.add_argument("--stats", default=None,
+        help="write per deck timers and counters of every stage into this ndjson file")
+    parser.add_argument("--profile", action="store_true", help="add cProfile hot spots to --stats")
+    parser.add_argument("--trace-memory", action="store_true", help="add tracemalloc peak memory to --stats")
+    parser.add_argument("--stream", action="store_true",
+        help="lay out cards as the plane is built without keeping whole decks in memory, planes are only checked "
+        "against a sample of cards")
+    arguments = parser.parse_args()
+    if arguments.stream and (arguments.incremental or arguments.matches):
+        parser.error("--stream can't be combined with --incremental or --matches, both of them need whole decks")
+    tooMany = [symbols for symbols in arguments.symbols if baseSymbolSize(symbols) < MIN_SYMBOL_SIZE]
+    if tooMany:
+        parser.error("no room on a card for " + ", ".join(map(str, tooMany)) + " symbols, "
+            + "symbols would have to be smaller than " + str(MIN_SYMBOL_SIZE))
+    return arguments
+
+
+if __name__ == "__main__":
+    arguments = parseArguments()
+    options = layoutOptions(backend=arguments.backend, unravel=arguments.unravel, cooling=arguments.cooling,
+        tolerance=arguments.tolerance)
+    binaryFile = open(arguments.binary, 'wb') if arguments.binary else None
+    reportFile = open(arguments.report, 'w') if arguments.report else None
+    statsFile = open(arguments.stats, 'w') if arguments.stats else None
+    instrumentation = ins.settings(arguments.profile, arguments.trace_memory) if arguments.stats else None
+    if arguments.incremental:
+        rebuilt = rebuildDecks(arguments.output, arguments.symbols, arguments.workers, arguments.seed, arguments.method,
+            arguments.chunk_size, options, arguments.format, arguments.precision, binaryFile, reportFile, statsFile,
+            instrumentation)
+        print("Laid out " + str(rebuilt) + " cards again")
+    else:
+        if arguments.seed is None:
+            arguments.seed = newSeed()
+            print("Generating with seed " + str(arguments.seed))
+        # a build failing halfway keeps the previous output
+        mc.replaceFile(arguments.output, lambda file: writeDecks(file, arguments.symbols, arguments.workers,
+            arguments.seed, arguments.method, arguments.chunk_size, options, arguments.format, arguments.precision,
+            binaryFile, reportFile, statsFile, instrumentation, arguments.stream))
+        bm.saveManifest(arguments.output, buildManifest(arguments.symbols, arguments.seed, arguments.method, options,
+            arguments.format, arguments.precision, arguments.stream))
+    if arguments.matches:
+        with open(arguments.matches, 'w') as file:
+            mi.writeMatchIndices(file, arguments.symbols, arguments.method)
+    if binaryFile is not None:
+        binaryFile.close()
+    if reportFile is not None:
+        reportFile.close()
+    if statsFile is not None:
+        statsFile.close()
@@ -0,0 +1,91 @@
+import numpy as np
+
+
+# compact form of a projective plane used instead of its dense (q^2 + q + 1)^2 incidence matrix
+# every card keeps the sorted ids of its q + 1 symbols, which takes O(q^3) memory instead of O(q^4)
+# the inverse index lists the q + 1 cards every symbol is printed on
+# the symbol shared by two cards is looked up in a table of every pair, built only once it is asked for
+def cardSymbolsOf(matrix):
+    # rows of the matrix are symbols and columns are cards, the same way card_creator reads it
+    matrix = np.asarray(matrix, dtype=bool)
+    cardIndices, symbolIndices = np.nonzero(matrix.T)
+    counts = np.bincount(cardIndices, minlength=matrix.shape[1])
+    if np.any(counts != counts[0]):
+        raise ValueError("Every card of a deck needs the same number of symbols")
+    return symbolIndices.reshape(matrix.shape[1], -1).astype(np.int32)
+
+
+def symbolCardsOf(cardSymbols, symbolCount):
+    # the same (card, symbol) pairs sorted by symbol, cards of every symbol come out sorted as well
+    cards = np.repeat(np.arange(len(cardSymbols), dtype=np.int32), cardSymbols.shape[1])
+    order = np.argsort(cardSymbols.ravel(), kind="stable")
+    counts = np.bincount(cardSymbols.ravel(), minlength=symbolCount)
+    if np.any(counts != counts[0]):
+        raise ValueError("Every symbol of a deck needs to be on the same number of cards")
+    return cards[order].reshape(symbolCount, -1)
+
+
+def pairTableOf(symbolCards, cardCount):
+    # table[first, second] is the symbol both cards hold, -1 on the diagonal
+    # symbols are written over all pairs of their cards at once, a plane covers every pair exactly once
+    table = np.full((cardCount, cardCount), -1, dtype=np.int32)
+    symbols = np.arange(len(symbolCards), dtype=np.int32)[:, None, None]
+    table[symbolCards[:, :, None], symbolCards[:, None, :]] = symbols
+    np.fill_diagonal(table, -1)
+    return table
+
+
+class Deck:
+    def __init__(self, cardSymbols, symbolCount=None):
+        self.cardSymbols = np.sort(np.array(cardSymbols, dtype=np.int32), axis=1)
+        self.order = self.cardSymbols.shape[1] - 1
+        self.symbolCount = len(self.cardSymbols) if symbolCount is None else symbolCount
+        self.symbolCards = symbolCardsOf(self.cardSymbols, self.symbolCount)
+        self.pairTable = None
+
+    def __len__(self):
+        return len(self.cardSymbols)
+
+    def symbolsOf(self, card):
+        return self.cardSymbols[card]
+
+    def cardsWith(self, symbol):
+        return self.symbolCards[symbol]
+
+    def sharedSymbols(self, firsts, seconds):
+        # O(1) per pair once the table is built, works for single cards as well as arrays of them
+        if self.pairTable is None:
+            self.pairTable = pairTableOf(self.symbolCards, len(self))
+        return self.pairTable[firsts, seconds]
+
+    def sharedSymbol(self, first, second):
+        return int(self.sharedSymbols(first, second))
+
+    def toMatrix(self):
+        matrix = np.zeros((self.symbolCount, len(self)), dtype=bool)
+        matrix[self.cardSymbols, np.arange(len(self))[:, None]] = True
+        return matrix
+
+
+class PartialDeck:
+    # consecutive cards of a deck starting at card start, enough to lay them out without the rest of the deck
+    def __init__(self, start, cardSymbols):
+        self.start = start
+        self.cardSymbols = np.sort(np.array(cardSymbols, dtype=np.int32), axis=1)
+
+    def __len__(self):
+        return len(self.cardSymbols)
+
+    def cardIndices(self):
+        return range(self.start, self.start + len(self))
+
+    def symbolsOf(self, card):
+        return self.cardSymbols[card - self.start]
+
+
+def deckFromMatrix(matrix):
+    return Deck(cardSymbolsOf(matrix), np.shape(matrix)[0])
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
@@ -0,0 +1,207 @@
+import numpy as np
+import argparse
+import json
+
+import deck_writer as dw
+
+
+# binary counterpart of GameTypes.json, loaded by memory mapping the file instead of parsing it
+# layout of a file:
+#   header        magic, version, coordinate type, number of decks and the offset of the deck table
+#   placements    for every deck (cards, symbols) packed records of symbol, size, coordinates and rotation
+#   deck table    number of symbols, number of cards and the offset of placements for every deck
+# the table is written last, so decks can be streamed into the file as their cards are laid out
+# coordinates produced by symbol_unravel are small whole numbers and fit into uint8,
+# anything else has to be written as float16; rotation is kept in hundredths of a degree, which is exact
+MAGIC = b"PIUD"
+VERSION = 1
+COORDINATE_TYPES = {"uint8": 0, "float16": 1}
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("coordinates", "<u2"),
+    ("decks", "<u4"),
+    ("table", "<u8")
+])
+DECK_DTYPE = np.dtype([
+    ("symbols", "<u2"),
+    ("cards", "<u4"),
+    ("offset", "<u8")
+])
+
+
+def placementDtype(coordinates):
+    return np.dtype([
+        ("symbol", "<u2"),
+        ("size", "u1"),
+        ("horizontal", "u1" if coordinates == "uint8" else "<f2"),
+        ("vertical", "u1" if coordinates == "uint8" else "<f2"),
+        ("rotation", "<u2")
+    ])
+
+
+def coordinatesOf(decks):
+    # uint8 if every coordinate is a whole number that fits, float16 otherwise
+    for deck in decks:
+        for card in deck["cards"]:
+            for symbol in card["symbols"]:
+                for value in (symbol["horizontal"], symbol["vertical"]):
+                    if value != int(value) or not 0 <= value <= 255:
+                        return "float16"
+    return "uint8"
+
+
+class BinaryDeckWriter:
+    # same interface as deck_writer.DeckWriter, file has to be opened in binary mode
+    def __init__(self, file, coordinates="uint8"):
+        if coordinates not in COORDINATE_TYPES:
+            raise ValueError("Unknown coordinate type " + str(coordinates))
+        self.file = file
+        self.coordinates = coordinates
+        self.dtype = placementDtype(coordinates)
+        self.table = []
+        self.start = file.tell()
+        # placeholder, the real header is written once the table offset is known
+        file.write(np.zeros(1, dtype=HEADER_DTYPE).tobytes())
+
+    def encodeCards(self, cards):
+        if self.coordinates == "uint8" and coordinatesOf([{"cards": cards}]) != "uint8":
+            raise ValueError("Coordinates don't fit into uint8, use float16 instead")
+        symbols = len(cards[0]["symbols"])
+        placements = np.zeros((len(cards), symbols), dtype=self.dtype)
+        for cardIndex, card in enumerate(cards):
+            if len(card["symbols"]) != symbols:
+                raise ValueError("Every card of a deck needs the same number of symbols")
+            for symbolIndex, symbol in enumerate(card["symbols"]):
+                placements[cardIndex, symbolIndex] = (symbol["symbol"], symbol["size"], symbol["horizontal"],
+                    symbol["vertical"], round(symbol["rotation"] * 100))
+        return placements
+
+    def writeCards(self, symbols, cards):
+        if not cards:
+            return
+        if not self.table or self.table[-1][0] != symbols:
+            self.table.append([symbols, 0, self.file.tell() - self.start])
+        self.file.write(self.encodeCards(cards).tobytes())
+        self.table[-1][1] += len(cards)
+
+    def close(self):
+        tableOffset = self.file.tell() - self.start
+        table = np.array([tuple(deck) for deck in self.table], dtype=DECK_DTYPE)
+        self.file.write(table.tobytes())
+        end = self.file.tell()
+
+        header = np.array([(MAGIC, VERSION, COORDINATE_TYPES[self.coordinates], len(table), tableOffset)],
+            dtype=HEADER_DTYPE)
+        self.file.seek(self.start)
+        self.file.write(header.tobytes())
+        self.file.seek(end)
+        self.file.flush()
+
+
+class BinaryDecks:
+    # every array returned here is a view into the memory mapped file, nothing is copied or parsed
+    def __init__(self, path):
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        self.header = self.data[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)[0]
+        if self.header["magic"] != MAGIC:
+            raise ValueError(str(path) + " is not a deck file")
+        if self.header["version"] != VERSION:
+            raise ValueError("Unsupported deck file version " + str(self.header["version"]))
+
+        coordinates = [name for name, code in COORDINATE_TYPES.items() if code == self.header["coordinates"]][0]
+        self.dtype = placementDtype(coordinates)
+        tableStart = int(self.header["table"])
+        tableEnd = tableStart + int(self.header["decks"]) * DECK_DTYPE.itemsize
+        self.table = self.data[tableStart:tableEnd].view(DECK_DTYPE)
+
+    def __len__(self):
+        return len(self.table)
+
+    def symbols(self):
+        return [int(symbols) for symbols in self.table["symbols"]]
+
+    def deck(self, index):
+        # (cards, symbols) structured array of a single deck
+        entry = self.table[index]
+        count = int(entry["cards"]) * int(entry["symbols"])
+        start = int(entry["offset"])
+        placements = self.data[start:start + count * self.dtype.itemsize].view(self.dtype)
+        return placements.reshape(int(entry["cards"]), int(entry["symbols"]))
+
+    def deckWithSymbols(self, symbols):
+        return self.deck(self.symbols().index(symbols))
+
+    def deckJSON(self, index):
+        cards = []
+        for card in self.deck(index):
+            cards.append({"symbols": [{
+                "symbol": int(placement["symbol"]),
+                "size": int(placement["size"]),
+                "horizontal": placement["horizontal"].item(),
+                "vertical": placement["vertical"].item(),
+                "rotation": int(placement["rotation"]) / 100
+            } for placement in card]})
+        return {"symbols": int(self.table[index]["symbols"]), "cards": cards}
+
+    def toJSON(self):
+        return [self.deckJSON(index) for index in range(len(self))]
+
+
+def writeBinary(file, decks, coordinates=None):
+    writer = BinaryDeckWriter(file, coordinates or coordinatesOf(decks))
+    for deck in decks:
+        writer.writeCards(deck["symbols"], deck["cards"])
+    writer.close()
+
+
+def convertJSON(jsonPath, binaryPath, coordinates=None):
+    with open(jsonPath, "r") as file:
+        decks = json.load(file)
+    with open(binaryPath, "wb") as file:
+        writeBinary(file, decks, coordinates)
+
+
+def convertBinary(binaryPath, jsonPath):
+    with open(jsonPath, "w") as file:
+        writer = dw.DeckWriter(file)
+        decks = BinaryDecks(binaryPath)
+        for index in range(len(decks)):
+            deck = decks.deckJSON(index)
+            writer.writeCards(deck["symbols"], deck["cards"])
+        writer.close()
+
+
+def parseArguments():
+    parser = argparse.ArgumentParser(description="Convert decks between GameTypes.json and the binary format")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    toBinary = commands.add_parser("to-binary", help="convert a json file into a binary one")
+    toBinary.add_argument("json")
+    toBinary.add_argument("binary")
+    toBinary.add_argument("--coordinates", choices=list(COORDINATE_TYPES), default=None)
+
+    toJSON = commands.add_parser("to-json", help="convert a binary file back into json")
+    toJSON.add_argument("binary")
+    toJSON.add_argument("json")
+
+    info = commands.add_parser("info", help="list decks stored in a binary file")
+    info.add_argument("binary")
+    return parser.parse_args()
+
+
+def main():
+    arguments = parseArguments()
+    if arguments.command == "to-binary":
+        convertJSON(arguments.json, arguments.binary, arguments.coordinates)
+    elif arguments.command == "to-json":
+        convertBinary(arguments.binary, arguments.json)
+    else:
+        decks = BinaryDecks(arguments.binary)
+        for index, symbols in enumerate(decks.symbols()):
+            print(str(symbols) + " symbols, " + str(len(decks.deck(index))) + " cards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import json
+
+
+# writes decks into a file as soon as their cards are laid out, instead of dumping one big list at the end
+# "pretty" gives the very same text as json.dump(decks, file, indent=4)
+# "compact" drops the whitespace and rounds floats to the given precision
+# "ndjson" writes every deck as a single compact line, so a reader can take decks one by one
+FORMATS = ["pretty", "compact", "ndjson"]
+INDENT = " " * 4
+
+
+def roundFloats(value, precision):
+    if isinstance(value, float):
+        return round(value, precision)
+    if isinstance(value, dict):
+        return {key: roundFloats(item, precision) for key, item in value.items()}
+    if isinstance(value, list):
+        return [roundFloats(item, precision) for item in value]
+    return value
+
+
+class DeckWriter:
+    def __init__(self, file, format="pretty", precision=2):
+        if format not in FORMATS:
+            raise ValueError("Unknown format " + str(format) + ", expected one of " + ", ".join(FORMATS))
+        self.file = file
+        self.format = format
+        self.precision = precision
+        self.symbols = None
+        self.deckCount = 0
+        self.cardCount = 0
+
+    def encodeCard(self, card):
+        if self.format == "pretty":
+            text = json.dumps(card, indent=4)
+            return "\n".join(INDENT * 3 + line for line in text.split("\n"))
+        return json.dumps(roundFloats(card, self.precision), separators=(",", ":"))
+
+    def beginDeck(self, symbols):
+        if self.format == "pretty":
+            opening = "[\n" if self.deckCount == 0 else ",\n"
+            self.file.write(opening + INDENT + "{\n" + INDENT * 2 + "\"symbols\": " + json.dumps(symbols) + ",\n"
+                + INDENT * 2 + "\"cards\": [")
+        elif self.format == "compact":
+            opening = "[" if self.deckCount == 0 else ","
+            self.file.write(opening + "{\"symbols\":" + json.dumps(symbols) + ",\"cards\":[")
+        else:
+            self.file.write("{\"symbols\":" + json.dumps(symbols) + ",\"cards\":[")
+        self.symbols = symbols
+        self.deckCount += 1
+        self.cardCount = 0
+
+    def endDeck(self):
+        if self.symbols is None:
+            return
+        if self.format == "pretty":
+            closing = "]" if self.cardCount == 0 else "\n" + INDENT * 2 + "]"
+            self.file.write(closing + "\n" + INDENT + "}")
+        elif self.format == "compact":
+            self.file.write("]}")
+        else:
+            self.file.write("]}\n")
+        self.file.flush()
+        self.symbols = None
+
+    def writeCards(self, symbols, cards):
+        # cards of the same deck may come in many parts, a different number of symbols starts a new deck
+        if symbols != self.symbols:
+            self.endDeck()
+            self.beginDeck(symbols)
+        for card in cards:
+            if self.format == "pretty":
+                separator = "\n" if self.cardCount == 0 else ",\n"
+            else:
+                separator = "" if self.cardCount == 0 else ","
+            self.file.write(separator + self.encodeCard(card))
+            self.cardCount += 1
+
+    def close(self):
+        self.endDeck()
+        if self.format == "pretty":
+            self.file.write("[]" if self.deckCount == 0 else "\n]")
+        elif self.format == "compact":
+            self.file.write("[]" if self.deckCount == 0 else "]")
+        self.file.flush()
+
+
+def readDecks(file):
+    # counterpart of the ndjson format, yields decks one at a time
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
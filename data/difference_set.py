@@ -0,0 +1,137 @@
+import numpy as np
+import json
+import os
+
+import finite_field_plane as ffp
+import matrix_cache as mc
+
+
+# script used to compute Singer perfect difference sets for any prime power order
+# GF(q^3) is built as GF(q)[x] modulo a cubic for which x acts as a Singer cycle,
+# cycling through all q^2 + q + 1 points of PG(2, q) before coming back to the start
+# exponents of x landing on the line of points with a vanishing x^2 coefficient form the difference set
+# computed sets are kept on disk, because finding the cubic is the only costly part
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "difference_sets.json")
+
+
+def pointIndex(field, element):
+    # index of the point in the same order as finite_field_plane.projectivePoints
+    q = field.order
+    if element[0] != 0:
+        inverse = field.inverse[element[0]]
+        return field.multiplication[element[1], inverse] * q + field.multiplication[element[2], inverse]
+    if element[1] != 0:
+        return q * q + field.multiplication[element[2], field.inverse[element[1]]]
+    return q * q + q
+
+
+def singerCycle(field, cubic):
+    # returns exponents with a vanishing x^2 coefficient or None if x is not a Singer cycle
+    size = field.order * (field.order + 1) + 1
+    add = field.addition
+    mul = field.multiplication
+    neg = field.negation
+    visited = np.zeros(size, dtype=bool)
+    differenceSet = []
+    element = (1, 0, 0)
+    for exponent in range(size):
+        index = pointIndex(field, element)
+        if visited[index]:
+            return None
+        visited[index] = True
+        if element[2] == 0:
+            differenceSet.append(exponent)
+
+        # x^3 = -(a x^2 + b x + c) for the cubic x^3 + a x^2 + b x + c
+        overflow = neg[element[2]]
+        element = (
+            mul[overflow, cubic[2]],
+            add[element[0], mul[overflow, cubic[1]]],
+            add[element[1], mul[overflow, cubic[0]]])
+
+    # after a full cycle we have to be back at the starting point
+    if pointIndex(field, element) != 0:
+        return None
+
+    return differenceSet
+
+
+def isPerfectDifferenceSet(differenceSet, size):
+    differences = (differenceSet[:, None] - differenceSet[None, :]) % size
+    counts = np.bincount(differences.ravel(), minlength=size)
+    return counts[0] == len(differenceSet) and np.all(counts[1:] == 1)
+
+
+def computePerfectDifferenceSet(order):
+    field = ffp.GaloisField(order)
+    size = order * (order + 1) + 1
+    for a in range(order):
+        for b in range(order):
+            for c in range(1, order):
+                differenceSet = singerCycle(field, (a, b, c))
+                if differenceSet is None:
+                    continue
+                differenceSet = np.asarray(differenceSet, dtype=np.int64)
+                if isPerfectDifferenceSet(differenceSet, size):
+                    return differenceSet
+
+    raise ArithmeticError("No Singer cycle found for order " + str(order))
+
+
+def loadCache():
+    if not os.path.exists(CACHE_PATH):
+        return {}
+    with open(CACHE_PATH, "r") as file:
+        return json.load(file)
+
+
+def storeDifferenceSet(key, differenceSet):
+    # loaded again under the lock, so sets other processes stored in the meantime are kept
+    try:
+        with mc.fileLock(CACHE_PATH + ".lock"):
+            cache = loadCache()
+            cache[key] = differenceSet
+            mc.replaceFile(CACHE_PATH, lambda file: json.dump(cache, file, sort_keys=True))
+    except OSError:
+        # read only installs compute the set again next time
+        pass
+
+
+def perfectDifferenceSet(order, useCache=True):
+    # without useCache an already cached set is still read, a newly computed one isn't written
+    cache = loadCache()
+    key = str(order)
+    if key not in cache:
+        cache[key] = computePerfectDifferenceSet(order).tolist()
+        if useCache:
+            storeDifferenceSet(key, cache[key])
+
+    return np.asarray(cache[key], dtype=np.int64)
+
+
+def differenceSetIncidenceMatrix(order, useCache=True):
+    differenceSet = perfectDifferenceSet(order, useCache)
+    size = order * (order + 1) + 1
+    # row i is the line made of the difference set shifted by i, all shifts are written at once
+    shifts = np.arange(size)[:, None]
+    matrix = np.zeros((size, size), dtype=bool)
+    matrix[shifts, (shifts + differenceSet[None, :]) % size] = True
+
+    return matrix
+
+
+def differenceSetCardBlocks(order, blockSize=256, useCache=True):
+    differenceSet = perfectDifferenceSet(order, useCache)
+    size = order * (order + 1) + 1
+    # card j of the matrix above holds every symbol i with i + d = j, so i = j - d for each d of the set
+    for start in range(0, size, blockSize):
+        cards = np.arange(start, min(start + blockSize, size))[:, None]
+        yield np.sort((cards - differenceSet[None, :]) % size, axis=1).astype(np.int32)
+
+
+def differenceSetCardSymbols(order, blockSize=256, useCache=True):
+    return np.concatenate(list(differenceSetCardBlocks(order, blockSize, useCache)))
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
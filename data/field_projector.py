@@ -1,86 +1,170 @@
-import numpy as np
-import re
+import warnings
 
 import binary_matrices_generator as bmg
 
-import projector_latin_square_finder as plsf
+import deck as dk
 
+import difference_set as ds
 
-def symbolProjection(numberOfSymbolsOnACard):
+import finite_field_plane as ffp
+
+import instrumentation as ins
+
+import latin_square_solver as lss
+
+import matrix_cache as mc
+
+import plane_verifier as pv
+
+
+def projectionMethod(order, method=None):
+    if method is not None:
+        return method
+
+    # ordered form with latin squares only works for the smaller orders
+    # it also doesn't work for order of 9, which puts the scientific paper
+    # this code is based on under scrutiny, so we construct the plane from GF(q) arithmetic instead
+    return "ordered" if 4 <= order <= 8 else "field"
+
+
+# method can force a construction for any prime power order:
+# "field" for GF(q) arithmetic or "singer" for cyclic planes from perfect difference sets
+# built matrices are kept in matrix_cache, so the next run with the same order and method only loads them
+def symbolProjection(numberOfSymbolsOnACard, method=None, useCache=True):
     order = numberOfSymbolsOnACard - 1
-    totalSymbols = order * (order + 1) + 1
-    # projection plane orders proven (or at least assumed) to be impossible
-    # (orders of projection planes are supposed to be a power of a prime number)
+    # orders of projection planes are supposed to be a power of a prime number
     # (existance of order of 12 is technically still an open question)
-    # symbol projection only works for those assumptions
-    # update the list if you need higher powers (at least for odd numbers, like 15)
-    if order in [6, 10, 12]:
+    # even if other orders exists, none of the algorithms below will find those
+    if ffp.primePowerFactors(order) is None:
         return None
 
-    # verify order being a prime power for the even number
-    # even if other orders exists, this algorithm won't find those
-    if order % 2 == 0:
-        otherFactor = order
-        while otherFactor % 2 == 0:
-            otherFactor //= 2
-        if otherFactor != 1:
-            return None
-    elif order > 9:
+    method = projectionMethod(order, method)
+    if method == "field":
+        build = lambda: ffp.planeIncidenceMatrix(order)
+    elif method == "singer":
+        build = lambda: ds.differenceSetIncidenceMatrix(order, useCache)
+    else:
+        build = lambda: orderedProjection(order, useCache)
+
+    with ins.timer("projection"):
+        matrix = cachedBuild("incidence", order, method, build, useCache)
+    # cheap enough to check every built or loaded matrix
+    if matrix is not None:
+        with ins.timer("verification"):
+            warnIfBroken(pv.verifyIncidence(matrix, limit=3), numberOfSymbolsOnACard)
+    return matrix
+
+
+# the same plane as symbolProjection, as symbols of every card instead of the dense matrix
+# "field" and "singer" construct those straight away, the ordered form is still assembled as a matrix first
+def symbolDeck(numberOfSymbolsOnACard, method=None, useCache=True):
+    order = numberOfSymbolsOnACard - 1
+    if ffp.primePowerFactors(order) is None:
+        return None
+
+    method = projectionMethod(order, method)
+    if method == "field":
+        build = lambda: ffp.planeCardSymbols(order)
+    elif method == "singer":
+        build = lambda: ds.differenceSetCardSymbols(order, useCache=useCache)
+    else:
+        build = lambda: orderedCardSymbols(order, useCache)
+
+    with ins.timer("projection"):
+        cardSymbols = cachedBuild("deck", order, method, build, useCache)
+    if cardSymbols is None:
         return None
+    with ins.timer("verification"):
+        warnIfBroken(pv.verifyCardSymbols(cardSymbols, limit=3), numberOfSymbolsOnACard)
+    return dk.Deck(cardSymbols)
+
 
-    # this method doesn't work for order of 9, which puts the scientific paper
-    # this code is based on under scrutiny
-    if order == 9:
-        incidenceMatrix = []
-        # read incidence matrix calculated using C++ from file
-        with open("order_9.csv", "r") as file:
-            for line in file:
-                incidenceMatrix.append(re.findall(r'\d', line))
-        return np.asarray(incidenceMatrix, dtype=np.uint8)
-        
+# the same cards as symbolDeck yielded one at a time, for orders whose whole deck shouldn't sit in memory
+# "field" and "singer" build a block of cards at a time and skip the cache, memory stays O(q^2) for any order
+# the ordered form is still built in full, it only exists for the small orders anyway
+# cards are checked on the way by a StreamVerifier, which compares them to a sample of the deck only
+# a block of lines takes about 20 bytes per line and point, small blocks keep the peak low at the same speed
+def streamCardSymbols(numberOfSymbolsOnACard, method=None, blockSize=32, verify=True):
+    order = numberOfSymbolsOnACard - 1
+    if ffp.primePowerFactors(order) is None:
+        return None
 
+    method = projectionMethod(order, method)
+    if method == "field":
+        blocks = ffp.cardSymbolBlocks(order, blockSize)
+    elif method == "singer":
+        blocks = ds.differenceSetCardBlocks(order, blockSize)
+    else:
+        blocks = orderedCardBlocks(order)
+    return verifiedCards(blocks, numberOfSymbolsOnACard, verify)
+
+
+def verifiedCards(blocks, numberOfSymbolsOnACard, verify):
+    order = numberOfSymbolsOnACard - 1
+    verifier = pv.StreamVerifier(order * (order + 1) + 1) if verify else None
+    while True:
+        with ins.timer("projection"):
+            block = next(blocks, None)
+        if block is None:
+            break
+        if verifier is not None:
+            with ins.timer("verification"):
+                verifier.addCards(block)
+        yield from block
+    if verifier is not None:
+        warnIfBroken(verifier.report(), numberOfSymbolsOnACard)
+
+
+def orderedCardBlocks(order):
+    cardSymbols = orderedCardSymbols(order)
+    if cardSymbols is not None:
+        yield cardSymbols
+
+
+def warnIfBroken(report, numberOfSymbolsOnACard):
+    # a warning instead of printing, so code embedding the generator decides whether and where it shows up
+    if not report["valid"]:
+        warnings.warn("Something is not right... Maybe the finite projective plane order is wrong?\n"
+            + pv.describeReport(report) + "\n"
+            + "Projection failed for " + str(numberOfSymbolsOnACard) + " symbols on a card. Refrain from using it!",
+            RuntimeWarning, stacklevel=3)
+
+
+def cachedBuild(kind, order, method, build, useCache):
+    # anything built on a square of a randomized portfolio worker is used but not cached,
+    # the cache only ever holds what the plain deterministic search gives, so every build stays reproducible
+    if not useCache:
+        return build()
+    searches = lss.randomizedSquares
+    return mc.cachedMatrix(kind, order, method, build, lambda: lss.randomizedSquares == searches)
+
+
+def orderedCardSymbols(order, useCache=True):
+    build = lambda: orderedProjection(order, useCache)
+    matrix = cachedBuild("incidence", order, "ordered", build, useCache)
+    return None if matrix is None else dk.cardSymbolsOf(matrix)
+
+
+def cachedLatinSquare(order, symmetrical, subMatrices, useCache):
+    solve = lss.symmetricalLatinSquare if symmetrical else lss.asymmetricalLatinSquare
+    build = lambda: solve(order - 1, subMatrices)
+    return cachedBuild("latin", order, "symmetrical" if symmetrical else "asymmetrical", build, useCache)
+
+
+def orderedProjection(order, useCache=True):
     incidenceMatrix = bmg.generateInitialMatrix(order)
 
     # fill the rest of the sub-matrices to complete incidence matrix of finite skew-field
     # they will be referred to as blocks for simplicity
-    blockPossibilities = np.zeros((order - 1, order, order), dtype=np.uint8)
-    blockAssignments = np.zeros((order - 1, order - 1), dtype=np.uint8)
-    if order % 2 == 1:
-        # generate cyclical sub-matrices
-        # WARNING: Despite what a certain scientific paper claims, 
-        # these may not be correct shapes to achieve a valid incidence matrix
-        # already verified it does NOT give a valid matrix for order of 9
-        blockShift = -1
-        for i in range(order - 1):
-            rowIterator = blockShift % order
-            for j in range(order):
-                blockPossibilities[i][rowIterator][j] = 1
-                rowIterator = (rowIterator + 1) % order
-            blockShift -= 1
-
-        # assign permutations to sub-matrices by creating a projector latin square
-        if (order < 8):
-            # works for smaller orders 
-            blockAssignments = plsf.symmetricalLatinSquare(order - 1, blockPossibilities)
-        else:
-            blockAssignments = plsf.asymmetricalLatinSquare(order - 1, blockPossibilities)
-    else:
-        blockPossibilities = bmg.generateEvenSizeSubMatrices(order)
+    blockPossibilities, symmetrical = lss.projectorSquareSetup(order)
 
-        # assign permutations to sub-matrices by creating a projector latin square
-        blockAssignments = plsf.asymmetricalLatinSquare(order - 1, blockPossibilities)
-    
-    bmg.applySubMatrices(incidenceMatrix, blockPossibilities, blockAssignments)
+    # assign permutations to sub-matrices by creating a projector latin square
+    blockAssignments = cachedLatinSquare(order, symmetrical, blockPossibilities, useCache)
 
-    transposed = np.transpose(incidenceMatrix)
-    onesMatrix = np.ones((totalSymbols, totalSymbols), dtype=np.int8)
-    multipliedMatrix = np.matmul(incidenceMatrix, transposed)
-    checkedMatrix = multipliedMatrix - onesMatrix
-    controlSum = checkedMatrix.sum()
-    if controlSum != (order * totalSymbols):
-        print("Something is not right... Maybe the finite projective plane order is wrong?")
-        print("Projection failed for " + str(numberOfSymbolsOnACard) + " symbols on a card. Refrain from using it!")
+    if blockAssignments is None:
+        return None
 
+    bmg.applySubMatrices(incidenceMatrix, blockPossibilities, blockAssignments)
     return incidenceMatrix
 
 
@@ -0,0 +1,135 @@
+import numpy as np
+
+
+# script used to construct Desarguesian projective planes PG(2, q) straight from GF(q) arithmetic
+# it works for every prime power order and takes polynomial time, no search is involved
+# elements of GF(p^k) are encoded as integers whose base p digits are coefficients of a polynomial
+# over GF(p), multiplication reduces those polynomials modulo an irreducible one of degree k
+def primePowerFactors(number):
+    if number < 2:
+        return None
+
+    prime = 2
+    while prime * prime <= number and number % prime != 0:
+        prime += 1
+    if number % prime != 0:
+        prime = number
+
+    exponent = 0
+    while number % prime == 0:
+        number //= prime
+        exponent += 1
+
+    # anything left means there was more than one prime factor
+    return (prime, exponent) if number == 1 else None
+
+
+class GaloisField:
+    def __init__(self, order):
+        factors = primePowerFactors(order)
+        if factors is None:
+            raise ValueError("Finite field order must be a prime power, got " + str(order))
+
+        self.order = order
+        self.characteristic, self.degree = factors
+        digits = self.toDigits(np.arange(order))
+        self.addition = self.fromDigits(
+            (digits[:, None, :] + digits[None, :, :]) % self.characteristic)
+        self.negation = self.fromDigits((-digits) % self.characteristic)
+        self.multiplication = self.findMultiplication(digits)
+        # every non-zero row of a field multiplication table contains exactly one 1
+        self.inverse = np.argmax(self.multiplication == 1, axis=1).astype(np.int32)
+        self.inverse[0] = 0
+
+    def toDigits(self, elements):
+        powers = self.characteristic ** np.arange(self.degree)
+        return (elements[..., None] // powers) % self.characteristic
+
+    def fromDigits(self, digits):
+        powers = self.characteristic ** np.arange(self.degree)
+        return (digits * powers).sum(axis=-1).astype(np.int32)
+
+    def multiplicationTable(self, digits, modulus):
+        p = self.characteristic
+        k = self.degree
+        # schoolbook product of every pair of polynomials at once
+        product = np.zeros((self.order, self.order, 2 * k - 1), dtype=np.int64)
+        for i in range(k):
+            for j in range(k):
+                product[:, :, i + j] += digits[:, None, i] * digits[None, :, j]
+        product %= p
+
+        # reduce the highest degree terms with the monic modulus x^k + modulus[k - 1] x^(k - 1) + ...
+        for degree in range(2 * k - 2, k - 1, -1):
+            coefficient = product[:, :, degree]
+            for term in range(k):
+                product[:, :, degree - k + term] -= coefficient * modulus[term]
+            product[:, :, degree] = 0
+            product %= p
+
+        return self.fromDigits(product[:, :, :k])
+
+    def findMultiplication(self, digits):
+        if self.degree == 1:
+            elements = np.arange(self.order)
+            return ((elements[:, None] * elements[None, :]) % self.order).astype(np.int32)
+
+        # first modulus without zero divisors is irreducible, they are common enough for brute force
+        for candidate in range(self.order):
+            modulus = self.toDigits(np.asarray(candidate))
+            if modulus[0] == 0:
+                continue
+            table = self.multiplicationTable(digits, modulus)
+            if np.all(table[1:, 1:] != 0):
+                return table
+
+        raise ArithmeticError("No irreducible polynomial found for order " + str(self.order))
+
+    def dot(self, first, second):
+        products = [self.multiplication[first[..., i], second[..., i]] for i in range(3)]
+        return self.addition[self.addition[products[0], products[1]], products[2]]
+
+
+def projectivePoints(order):
+    # normalised homogeneous coordinates, the first non-zero coordinate is always equal to 1
+    # points (1, x, y) come first, then (0, 1, z) and finally (0, 0, 1)
+    squared = order * order
+    elements = np.arange(order, dtype=np.int32)
+    points = np.zeros((squared + order + 1, 3), dtype=np.int32)
+    points[:squared, 0] = 1
+    points[:squared, 1] = np.repeat(elements, order)
+    points[:squared, 2] = np.tile(elements, order)
+    points[squared:squared + order, 1] = 1
+    points[squared:squared + order, 2] = elements
+    points[-1, 2] = 1
+
+    return points
+
+
+def planeIncidenceMatrix(order):
+    field = GaloisField(order)
+    # lines use the same coordinates as points, which makes the matrix symmetric
+    # a point lies on a line when their dot product over GF(q) vanishes
+    points = projectivePoints(order)
+    products = field.dot(points[:, None, :], points[None, :, :])
+
+    return products == 0
+
+
+def cardSymbolBlocks(order, blockSize=256):
+    # symbols of every card (line) without the dense matrix, only a block of lines is compared at a time
+    # memory stays O(q^2) for any order, the field tables and points are the largest arrays kept
+    field = GaloisField(order)
+    points = projectivePoints(order)
+    for start in range(0, len(points), blockSize):
+        lines = points[start:start + blockSize]
+        isIncident = field.dot(lines[:, None, :], points[None, :, :]) == 0
+        yield np.nonzero(isIncident)[1].reshape(len(lines), order + 1).astype(np.int32)
+
+
+def planeCardSymbols(order, blockSize=256):
+    return np.concatenate(list(cardSymbolBlocks(order, blockSize)))
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
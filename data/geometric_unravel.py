@@ -0,0 +1,95 @@
+import numpy as np
+
+import instrumentation as ins
+
+
+# continuous alternative to the raster of symbol_unravel
+# symbols are axis aligned boxes of size + 2 (the same margin the raster keeps) that have to stay inside the card circle
+# overlapping boxes are found with sweep and prune along the horizontal axis
+# and pushed apart by the shortest translation that separates them, each of them taking half of it
+# boxes sticking out of the card are then pulled back inside along the line to its center
+# coordinates are the same as in symbol_unravel, with the card spanning from 0 to 100
+CENTER = 50
+RADIUS = 49
+
+
+def overlappingPairs(positions, extents):
+    # sweep and prune, only boxes whose horizontal spans overlap are compared on the other axis
+    order = np.argsort(positions[:, 0], kind="stable")
+    active = []
+    pairs = []
+    for index in order:
+        start = positions[index, 0]
+        active = [other for other in active if positions[other, 0] + extents[other] > start]
+        for other in active:
+            isVerticalyOverlapping = positions[index, 1] < positions[other, 1] + extents[other] \
+                and positions[other, 1] < positions[index, 1] + extents[index]
+            if isVerticalyOverlapping:
+                pairs.append((other, index))
+        active.append(index)
+    return pairs
+
+
+def separationVector(positions, extents, first, second):
+    # minimum translation vector moving the first box out of the second one
+    firstEnd = positions[first] + extents[first]
+    secondEnd = positions[second] + extents[second]
+    overlap = np.minimum(firstEnd, secondEnd) - np.maximum(positions[first], positions[second])
+    axis = 0 if overlap[0] < overlap[1] else 1
+    firstCenter = positions[first, axis] + extents[first] / 2
+    secondCenter = positions[second, axis] + extents[second] / 2
+    # boxes with the very same center are split by their order, the same way the layout splits them
+    direction = 1 if firstCenter > secondCenter or (firstCenter == secondCenter and first > second) else -1
+    vector = np.zeros(2, dtype=np.float64)
+    vector[axis] = overlap[axis] * direction
+    return vector
+
+
+def projectIntoCircle(positions, extents):
+    # the corner farthest from the center decides how far the whole box has to move towards it
+    for index in range(len(positions)):
+        corners = positions[index] + np.array([[0, 0], [1, 0], [0, 1], [1, 1]]) * extents[index]
+        offsets = corners - CENTER
+        distances = np.sqrt((offsets ** 2).sum(axis=1))
+        farthest = np.argmax(distances)
+        if distances[farthest] > RADIUS:
+            positions[index] -= offsets[farthest] / distances[farthest] * (distances[farthest] - RADIUS)
+
+
+def resolveOverlaps(positions, extents, iterations=200, tolerance=1e-6):
+    positions = np.array(positions, dtype=np.float64)
+    extents = np.asarray(extents, dtype=np.float64)
+    projectIntoCircle(positions, extents)
+    for loop in range(iterations):
+        pairs = overlappingPairs(positions, extents)
+        if not pairs:
+            break
+        ins.count("unravelRetries")
+
+        displacements = np.zeros_like(positions)
+        for first, second in pairs:
+            vector = separationVector(positions, extents, first, second)
+            # a tiny extra push so boxes that just touch are not counted as overlapping again due to rounding
+            vector += np.sign(vector) * tolerance
+            displacements[first] += vector / 2
+            displacements[second] -= vector / 2
+        positions += displacements
+        projectIntoCircle(positions, extents)
+
+    return positions
+
+
+def unravelSymbols(symbolList, isRounded=True):
+    # takes the same symbol_unravel.Symbol objects, but uses their exact positions instead of the rounded ones
+    positions = np.array([symbol.position for symbol in symbolList], dtype=np.float64)
+    extents = np.array([symbol.size + 2 for symbol in symbolList], dtype=np.float64)
+    positions = resolveOverlaps(positions, extents)
+    if not isRounded:
+        return [position + 1 for position in positions]
+
+    # whole numbers like the raster gives, boxes still keep their margin since it covers the rounding
+    return [np.round(position + 1).astype(np.int64) for position in positions]
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
@@ -0,0 +1,80 @@
+import numpy as np
+
+import binary_matrices_generator as bmg
+
+
+# rows and columns of the incidence matrix are kept as bitsets packed into python integers
+# two cards share as many symbols as the popcount of their bitwise AND, which makes each pair check
+# a couple of machine operations instead of a loop over every point
+def packRow(row):
+    packed = np.packbits(np.asarray(row, dtype=np.uint8), bitorder="little")
+    return int.from_bytes(packed.tobytes(), "little")
+
+
+def packRows(matrix):
+    return [packRow(row) for row in matrix]
+
+
+def hasUniqueIntersections(packedRows, rowIndices=None, strict=True):
+    # strict check needs exactly one common point, otherwise only more than one is an error
+    # which is what we want for partially filled matrices
+    checkedIndices = range(len(packedRows)) if rowIndices is None else rowIndices
+    for rowIndex in checkedIndices:
+        row = packedRows[rowIndex]
+        for otherIndex in range(len(packedRows)):
+            if otherIndex == rowIndex or (rowIndices is None and otherIndex < rowIndex):
+                continue
+            common = (row & packedRows[otherIndex]).bit_count()
+            if common > 1 or (strict and common == 0):
+                return False
+    return True
+
+
+# keeps the incidence matrix of a partially filled latin square of blocks up to date
+# assigning or removing a block only flips its bits, so backtracking costs as much as moving forward
+class IncidenceChecker:
+    def __init__(self, subMatrices):
+        self.subMatrixSize = len(subMatrices[0])
+        self.displacement = 2 * self.subMatrixSize + 1
+        self.assignments = {}
+
+        initialMatrix = bmg.generateInitialMatrix(self.subMatrixSize)
+        self.rows = packRows(initialMatrix)
+        self.columns = packRows(np.transpose(initialMatrix))
+        self.subMatrixRows = [packRows(subMatrix) for subMatrix in subMatrices]
+        self.subMatrixColumns = [packRows(np.transpose(subMatrix)) for subMatrix in subMatrices]
+
+    def blockIndices(self, blockIndex):
+        start = self.displacement + blockIndex * self.subMatrixSize
+        return range(start, start + self.subMatrixSize)
+
+    def toggleBlock(self, rowIndex, columnIndex, value):
+        rowShift = self.displacement + columnIndex * self.subMatrixSize
+        columnShift = self.displacement + rowIndex * self.subMatrixSize
+        for inner, matrixRow in enumerate(self.blockIndices(rowIndex)):
+            self.rows[matrixRow] ^= self.subMatrixRows[value][inner] << rowShift
+        for inner, matrixColumn in enumerate(self.blockIndices(columnIndex)):
+            self.columns[matrixColumn] ^= self.subMatrixColumns[value][inner] << columnShift
+
+    def assign(self, rowIndex, columnIndex, value):
+        if (rowIndex, columnIndex) in self.assignments:
+            self.unassign(rowIndex, columnIndex)
+        self.assignments[(rowIndex, columnIndex)] = value
+        self.toggleBlock(rowIndex, columnIndex, value)
+
+    def unassign(self, rowIndex, columnIndex):
+        value = self.assignments.pop((rowIndex, columnIndex), None)
+        if value is not None:
+            self.toggleBlock(rowIndex, columnIndex, value)
+
+    def isConsistent(self, rowIndex, columnIndex):
+        # only rows and columns going through the changed block could have gained a second common point
+        return hasUniqueIntersections(self.rows, self.blockIndices(rowIndex), False) \
+            and hasUniqueIntersections(self.columns, self.blockIndices(columnIndex), False)
+
+    def isValid(self):
+        return hasUniqueIntersections(self.rows)
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
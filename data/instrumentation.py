@@ -0,0 +1,136 @@
+import cProfile
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+# per stage timers and counters of deck generation, collected only while a recording is active
+# without a recording every hook is a single check of a global, so instrumented code runs at full speed
+# timers add up calls and wall clock seconds of a stage, counters add up anything else worth knowing:
+# backtracking nodes, verified planes, layout iterations, unravel retries
+# cProfile and tracemalloc are opt-in, both of them slow the recorded code down considerably
+# reports are plain dicts of json types, so they can be sent back from worker processes and merged
+PROFILED_FUNCTIONS = 20
+NO_TIMER = nullcontext()
+active = None
+
+
+def settings(profile=False, memory=False):
+    return {"profile": profile, "memory": memory}
+
+
+def emptyReport():
+    return {"timers": {}, "counters": {}}
+
+
+class Recorder:
+    def __init__(self, profile=False, memory=False):
+        self.report = emptyReport()
+        self.profiler = cProfile.Profile() if profile else None
+        self.isTracing = memory and not tracemalloc.is_tracing()
+
+    @contextmanager
+    def timer(self, name):
+        startTime = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.report["timers"].setdefault(name, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += time.perf_counter() - startTime
+
+    def count(self, name, amount):
+        counters = self.report["counters"]
+        counters[name] = counters.get(name, 0) + amount
+
+    def start(self):
+        if self.isTracing:
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.report["profile"] = profileEntries(self.profiler)
+        if self.isTracing:
+            self.report["peakBytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return self.report
+
+
+def profileEntries(profiler):
+    # every profiled function as "file:line(function)": [calls, own seconds, cumulative seconds]
+    # reports keep all of them, so merged reports add up whole profiles and only the final one is cut to the top
+    entries = {}
+    for (fileName, line, function), (_, calls, ownTime, cumulativeTime, _) in pstats.Stats(profiler).stats.items():
+        entries[fileName + ":" + str(line) + "(" + function + ")"] = [calls, ownTime, cumulativeTime]
+    return entries
+
+
+def topEntries(entries):
+    # functions taking the most cumulative time
+    ordered = sorted(entries.items(), key=lambda item: item[1][2], reverse=True)
+    return dict(ordered[:PROFILED_FUNCTIONS])
+
+
+@contextmanager
+def recording(options):
+    # options made by settings(), None records nothing and yields None
+    global active
+    if options is None:
+        yield None
+        return
+    recorder = Recorder(**options)
+    previous = active
+    active = recorder
+    recorder.start()
+    try:
+        yield recorder
+    finally:
+        recorder.stop()
+        active = previous
+
+
+@contextmanager
+def recordingInto(reports, key, options):
+    # the same as recording, with the report merged into reports[key] once it is done
+    with recording(options) as recorder:
+        yield recorder
+    if recorder is not None and reports is not None:
+        mergeReports(reports.setdefault(key, emptyReport()), recorder.report)
+
+
+def timer(name):
+    if active is None:
+        return NO_TIMER
+    return active.timer(name)
+
+
+def count(name, amount=1):
+    if active is not None:
+        active.count(name, amount)
+
+
+def mergeReports(total, report):
+    # adds the report into the total one, peak memory is the largest peak of all of them
+    for name, entry in report["timers"].items():
+        totalEntry = total["timers"].setdefault(name, {"calls": 0, "seconds": 0.0})
+        totalEntry["calls"] += entry["calls"]
+        totalEntry["seconds"] += entry["seconds"]
+    for name, amount in report["counters"].items():
+        total["counters"][name] = total["counters"].get(name, 0) + amount
+    if "peakBytes" in report:
+        total["peakBytes"] = max(total.get("peakBytes", 0), report["peakBytes"])
+    if "profile" in report:
+        profile = dict(total.get("profile", {}))
+        for function, (calls, ownTime, cumulativeTime) in report["profile"].items():
+            totalCalls, totalOwnTime, totalCumulativeTime = profile.get(function, [0, 0.0, 0.0])
+            profile[function] = [totalCalls + calls, totalOwnTime + ownTime, totalCumulativeTime + cumulativeTime]
+        total["profile"] = profile
+    return total
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
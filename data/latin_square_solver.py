@@ -0,0 +1,687 @@
+import numpy as np
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+import binary_matrices_generator as bmg
+
+import incidence_checker as ic
+
+import instrumentation as ins
+
+import plane_verifier as pv
+
+import projector_latin_square_finder as plsf
+
+
+# constraint propagating alternative to the depth fills of projector_latin_square_finder
+# fields forced to hold the same symbol (transposed or mirrored ones) are merged into a single variable
+# domains are kept as integer bitmasks, the variable with the fewest possibilities is always filled first
+# and every assignment removes its symbol from all the variables sharing a row, column or diagonal with it
+# two rows of blocks may also share every pair of inner rows only once, so each pair of them
+# keeps a bitmask of already shared pairs, which lets us cross out blocks that would share one again
+# all changes are written down on a trail, so going back is just replaying the trail in reverse
+def bitCount(mask):
+    return mask.bit_count()
+
+
+def sharedPairs(first, second):
+    # bit x * size + y is set when row x of the first block and row y of the second share a point
+    shared = (np.asarray(first, dtype=np.int64) @ np.asarray(second, dtype=np.int64).T).ravel() > 0
+    return ic.packRow(shared)
+
+
+def maskValues(mask):
+    value = 0
+    while mask:
+        if mask & 1:
+            yield value
+        mask >>= 1
+        value += 1
+
+
+# number of processes racing each other in portfolioLatinSquare, 1 runs only the deterministic search
+portfolioWorkers = 1
+# squares latinSquare took from randomized portfolio workers, they differ from run to run and can't be cached
+randomizedSquares = 0
+# seconds between two looks at portfolio workers that might have been killed without reporting
+POLL_SECONDS = 1.0
+# nodes of the first randomized restart, every next one gets RESTART_GROWTH times more
+RESTART_NODES = 200
+RESTART_GROWTH = 1.5
+# seconds between two checkpoints of solveResumable
+CHECKPOINT_SECONDS = 60
+
+
+class LatinSquareSolver:
+    # with a numpy generator ties between variables and the order of values are random,
+    # nodeLimit stops the search once it visited that many nodes, leaving every variable unassigned
+    def __init__(self, size, subMatrices, symmetrical=False, generator=None, nodeLimit=None):
+        self.size = size
+        self.symmetrical = symmetrical
+        self.checker = ic.IncidenceChecker(subMatrices)
+        self.generator = generator
+        self.nodeLimit = nodeLimit
+        self.isAborted = False
+        self.nodes = 0
+        self.backtracks = 0
+        self.restarts = 0
+        self.seconds = 0.0
+        self.solved = False
+        self.isPaused = False
+        self.isStarted = False
+        self.stack = []
+
+        self.fieldVariables = self.groupFields()
+        variableCount = max(self.fieldVariables.values()) + 1
+        self.fields = [[] for _ in range(variableCount)]
+        for field, variable in self.fieldVariables.items():
+            self.fields[variable].append(field)
+
+        self.values = [-1] * variableCount
+        self.domains = [(1 << size) - 1] * variableCount
+        self.neighbours = [set() for _ in range(variableCount)]
+        self.trail = []
+
+        subMatrices = np.asarray(subMatrices)
+        self.blocksDigest = hashlib.sha256(np.ascontiguousarray(subMatrices, dtype=np.uint8).tobytes()).hexdigest()
+        self.rowGraphs = [[sharedPairs(first, second) for second in subMatrices] for first in subMatrices]
+        self.columnGraphs = [[sharedPairs(first.T, second.T) for second in subMatrices] for first in subMatrices]
+        # the identity strip already makes rows and columns with the same inner index meet
+        blockSize = len(subMatrices[0])
+        identity = ic.packRow(np.eye(blockSize, dtype=np.uint8).ravel())
+        linePairs = [(first, second) for first in range(size) for second in range(first + 1, size)]
+        self.rowPairs = {pair: identity for pair in linePairs}
+        self.columnPairs = {pair: identity for pair in linePairs}
+        self.allPairs = (1 << (blockSize * blockSize)) - 1
+        self.isFeasible = self.restrictDomains() and self.connectVariables()
+
+    def equalFields(self, rowIndex, columnIndex):
+        size = self.size
+        if not self.symmetrical:
+            # since the used latin square must be isomorphic, we use the same rows as columns
+            return [(columnIndex, rowIndex)]
+
+        # rows of the second half are reversed rows of the first one
+        # and the projecting part of the first half is transposed
+        fields = [(size - rowIndex - 1, size - columnIndex - 1)]
+        if rowIndex < size // 2 and columnIndex < size // 2:
+            fields.append((columnIndex, rowIndex))
+        return fields
+
+    def groupFields(self):
+        # union find over fields that have to hold the same symbol
+        parents = {}
+
+        def find(field):
+            while parents[field] != field:
+                parents[field] = parents[parents[field]]
+                field = parents[field]
+            return field
+
+        fields = [(row, column) for row in range(self.size) for column in range(self.size)]
+        for field in fields:
+            parents[field] = field
+        for field in fields:
+            for equalField in self.equalFields(*field):
+                parents[find(equalField)] = find(field)
+
+        roots = {}
+        return {field: roots.setdefault(find(field), len(roots)) for field in fields}
+
+    def restrictDomains(self):
+        # same assumptions about the square as the depth fills use
+        rowLimit = self.size // 2 if self.symmetrical else self.size
+        for rowIndex in range(rowLimit):
+            for columnIndex in range(self.size):
+                possibilities = plsf.SquareField(self.size, columnIndex, rowIndex).possibilities
+                mask = 0
+                for possibility in possibilities:
+                    mask |= 1 << possibility
+                self.domains[self.fieldVariables[(rowIndex, columnIndex)]] &= mask
+
+        return all(domain != 0 for domain in self.domains)
+
+    def constraintGroups(self):
+        size = self.size
+        groups = [[(row, column) for column in range(size)] for row in range(size)]
+        groups += [[(row, column) for row in range(size)] for column in range(size)]
+        if not self.symmetrical:
+            # in asymetric latin square main diagonal also needs to satisfy uniqness rules
+            groups.append([(i, i) for i in range(1, size)])
+        return groups
+
+    def connectVariables(self):
+        for group in self.constraintGroups():
+            variables = [self.fieldVariables[field] for field in group]
+            if len(set(variables)) != len(variables):
+                # two fields of the same row or column would need to hold the same symbol
+                return False
+            for variable in variables:
+                self.neighbours[variable].update(other for other in variables if other != variable)
+        return True
+
+    def selectVariable(self):
+        selected = None
+        selectedCount = self.size + 1
+        ties = []
+        for variable, domain in enumerate(self.domains):
+            if self.values[variable] != -1:
+                continue
+            count = bitCount(domain)
+            if count < selectedCount:
+                selected = variable
+                selectedCount = count
+                ties = [variable]
+            elif count == selectedCount:
+                ties.append(variable)
+        if self.generator is not None and len(ties) > 1:
+            return ties[self.generator.integers(len(ties))]
+        return selected
+
+    def valueOrder(self, domain):
+        values = list(maskValues(domain))
+        if self.generator is not None:
+            self.generator.shuffle(values)
+        return values
+
+    def setEntry(self, container, key, value):
+        self.trail.append((container, key, container[key]))
+        container[key] = value
+
+    def fieldValue(self, field):
+        return self.values[self.fieldVariables[field]]
+
+    def restrictField(self, field, allowed):
+        variable = self.fieldVariables[field]
+        domain = self.domains[variable] & allowed
+        if domain != self.domains[variable]:
+            self.setEntry(self.domains, variable, domain)
+        return domain != 0
+
+    def compatibleValues(self, graphs, shared, known, isKnownFirst, domain):
+        allowed = 0
+        for value in maskValues(domain):
+            graph = graphs[known][value] if isKnownFirst else graphs[value][known]
+            if graph & shared == 0:
+                allowed |= 1 << value
+        return allowed
+
+    def propagateLines(self, field, transposed):
+        # rows and columns of blocks follow the same rules, transposing lets one method handle both
+        def lineField(line, position):
+            return (position, line) if transposed else (line, position)
+
+        line, position = (field[1], field[0]) if transposed else field
+        graphs = self.columnGraphs if transposed else self.rowGraphs
+        pairs = self.columnPairs if transposed else self.rowPairs
+        value = self.fieldValue(field)
+        for otherLine in range(self.size):
+            if otherLine == line:
+                continue
+            key = (min(line, otherLine), max(line, otherLine))
+            otherField = lineField(otherLine, position)
+            otherValue = self.fieldValue(otherField)
+            if otherValue == -1:
+                domain = self.domains[self.fieldVariables[otherField]]
+                allowed = self.compatibleValues(graphs, pairs[key], value, line < otherLine, domain)
+                if not (self.restrictField(otherField, allowed) and self.canCompletePair(key, graphs, pairs, lineField)):
+                    return False
+                continue
+
+            graph = graphs[value][otherValue] if line < otherLine else graphs[otherValue][value]
+            if graph & pairs[key]:
+                return False
+            self.setEntry(pairs, key, pairs[key] | graph)
+
+            # every half assigned pair of blocks in those two lines has fewer options now
+            for otherPosition in range(self.size):
+                firstField = lineField(key[0], otherPosition)
+                secondField = lineField(key[1], otherPosition)
+                firstValue = self.fieldValue(firstField)
+                secondValue = self.fieldValue(secondField)
+                if (firstValue == -1) == (secondValue == -1):
+                    continue
+                isKnownFirst = firstValue != -1
+                knownValue = firstValue if isKnownFirst else secondValue
+                unknownField = secondField if isKnownFirst else firstField
+                domain = self.domains[self.fieldVariables[unknownField]]
+                allowed = self.compatibleValues(graphs, pairs[key], knownValue, isKnownFirst, domain)
+                if not self.restrictField(unknownField, allowed):
+                    return False
+
+            if not self.canCompletePair(key, graphs, pairs, lineField):
+                return False
+
+        return True
+
+    def canCompletePair(self, key, graphs, pairs, lineField):
+        # a complete pair of lines shares every pair of inner rows exactly once,
+        # so whatever is still missing has to be reachable by blocks that are not placed yet
+        # and a pair reachable by only one block forces that block
+        placed = pairs[key]
+        halfPlaced = []
+        for position in range(self.size):
+            firstField = lineField(key[0], position)
+            secondField = lineField(key[1], position)
+            firstValue = self.fieldValue(firstField)
+            secondValue = self.fieldValue(secondField)
+            if firstValue == -1 and secondValue == -1:
+                # too many combinations to bother, anything could be covered
+                return True
+            if firstValue != -1 and secondValue != -1:
+                # it might not be counted yet if the other field of the same variable is in the middle of propagation
+                placed |= graphs[firstValue][secondValue]
+            elif firstValue != -1:
+                halfPlaced.append((secondField, firstValue, True))
+            else:
+                halfPlaced.append((firstField, secondValue, False))
+
+        reachable = placed
+        reachableTwice = 0
+        options = []
+        for unknownField, knownValue, isKnownFirst in halfPlaced:
+            for value in maskValues(self.domains[self.fieldVariables[unknownField]]):
+                graph = graphs[knownValue][value] if isKnownFirst else graphs[value][knownValue]
+                if graph & placed == 0:
+                    reachableTwice |= reachable & graph
+                    reachable |= graph
+                    options.append((unknownField, value, graph))
+        if reachable != self.allPairs:
+            return False
+
+        reachableOnce = self.allPairs & ~reachableTwice & ~placed
+        for unknownField, value, graph in options:
+            if graph & reachableOnce and not self.restrictField(unknownField, 1 << value):
+                return False
+        return True
+
+    def assign(self, variable, value):
+        self.values[variable] = value
+        for field in self.fields[variable]:
+            self.checker.assign(field[0], field[1], value)
+
+        bit = 1 << value
+        for neighbour in self.neighbours[variable]:
+            if self.values[neighbour] == -1 and self.domains[neighbour] & bit:
+                self.setEntry(self.domains, neighbour, self.domains[neighbour] & ~bit)
+                if self.domains[neighbour] == 0:
+                    return False
+
+        for field in self.fields[variable]:
+            if not (self.propagateLines(field, False) and self.propagateLines(field, True)):
+                return False
+        return True
+
+    def unassign(self, variable, trailMark):
+        while len(self.trail) > trailMark:
+            container, key, previous = self.trail.pop()
+            container[key] = previous
+        for field in self.fields[variable]:
+            self.checker.unassign(field[0], field[1])
+        self.values[variable] = -1
+
+    def openFrame(self):
+        # a new node of the search, False once every variable holds a value or nodeLimit was hit
+        self.nodes += 1
+        if self.nodeLimit is not None and self.nodes > self.nodeLimit:
+            self.isAborted = True
+            return False
+        variable = self.selectVariable()
+        if variable is None:
+            return False
+        # variable, values still to try, trail length before the current value and the current value
+        self.stack.append([variable, self.valueOrder(self.domains[variable]), len(self.trail), -1])
+        return True
+
+    def unwind(self):
+        while self.stack:
+            variable, _, trailMark, value = self.stack.pop()
+            if value != -1:
+                self.unassign(variable, trailMark)
+
+    def isOverBudget(self, maxNodes, deadline):
+        return (maxNodes is not None and self.nodes >= maxNodes) or \
+            (deadline is not None and time.perf_counter() >= deadline)
+
+    def search(self, maxNodes=None, deadline=None, onStep=None):
+        # depth first search kept on an explicit stack instead of python recursion, values are tried
+        # in the same order a recursive search would try them, so it finds the same square after as many nodes
+        # returns True when solved, False when there is no square or nodeLimit was hit and None once
+        # maxNodes or the deadline ran out, the stack is left as it was, so calling search again resumes it
+        if not self.isStarted:
+            self.isStarted = True
+            if not self.openFrame():
+                return not self.isAborted and self.checker.isValid()
+
+        while self.stack:
+            if self.isOverBudget(maxNodes, deadline):
+                return None
+            if onStep is not None:
+                onStep()
+
+            frame = self.stack[-1]
+            variable, values, trailMark, value = frame
+            if value != -1:
+                # the current value led nowhere
+                self.unassign(variable, trailMark)
+                frame[3] = -1
+                self.backtracks += 1
+            if not values:
+                self.stack.pop()
+                continue
+
+            frame[2] = len(self.trail)
+            frame[3] = values.pop(0)
+            if self.assign(variable, frame[3]) and not self.openFrame():
+                if self.isAborted:
+                    self.unwind()
+                    return False
+                if self.checker.isValid():
+                    return True
+
+        return False
+
+    def checkpoint(self):
+        # json state of a paused search, the stack is written as the chosen values with the values left to try
+        # since propagation is deterministic, replaying those choices restores domains, pairs and the trail
+        # a solved search keeps the stack of its square, so restoring it gives the square back
+        return {
+            "size": self.size,
+            "symmetrical": self.symmetrical,
+            "blocks": self.blocksDigest,
+            "started": self.isStarted,
+            "solved": self.solved,
+            "stack": [[variable, value, list(values)] for variable, values, _, value in self.stack],
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "seconds": self.seconds,
+            "generator": None if self.generator is None else self.generator.bit_generator.state
+        }
+
+    def restore(self, checkpoint):
+        if (checkpoint["size"], checkpoint["symmetrical"], checkpoint["blocks"]) != \
+                (self.size, self.symmetrical, self.blocksDigest):
+            raise ValueError("Checkpoint was written by a search for a different latin square")
+        self.unwind()
+        for variable, value, values in checkpoint["stack"]:
+            self.stack.append([variable, list(values), len(self.trail), value])
+            if value != -1:
+                # the last choice may have failed to propagate, it is then undone by the next step as before
+                self.assign(variable, value)
+        self.isStarted = checkpoint["started"]
+        self.solved = checkpoint["solved"]
+        self.nodes = checkpoint["nodes"]
+        self.backtracks = checkpoint["backtracks"]
+        self.seconds = checkpoint["seconds"]
+        if checkpoint["generator"] is not None and self.generator is not None:
+            self.generator.bit_generator.state = checkpoint["generator"]
+
+    def progress(self):
+        report = self.report()
+        report["depth"] = len(self.stack)
+        report["assigned"] = sum(value != -1 for value in self.values)
+        report["variables"] = len(self.values)
+        return report
+
+    def solveResumable(self, checkpointPath=None, checkpointSeconds=CHECKPOINT_SECONDS, maxNodes=None,
+            maxSeconds=None, onProgress=None):
+        # search that can be stopped and picked up again, possibly by another process after a crash
+        # the state is written to checkpointPath every checkpointSeconds and once the budget runs out,
+        # an existing checkpoint is resumed; maxNodes and maxSeconds are budgets of this run alone,
+        # so running it again with the same budget carries on where the previous run stopped
+        # onProgress gets progress() at every checkpoint, returns the square or None when unsolved or paused
+        if checkpointPath is not None and os.path.exists(checkpointPath):
+            self.restore(loadCheckpoint(checkpointPath))
+            if self.solved:
+                # searching on would only backtrack past the square that was already found
+                self.isPaused = False
+                return self.square()
+        startTime = time.perf_counter()
+        startSeconds = self.seconds
+        deadline = None if maxSeconds is None else startTime + maxSeconds
+        nodeLimit = None if maxNodes is None else self.nodes + maxNodes
+        nextCheckpoint = [startTime + checkpointSeconds]
+
+        def save():
+            self.seconds = startSeconds + time.perf_counter() - startTime
+            if checkpointPath is not None:
+                saveCheckpoint(checkpointPath, self.checkpoint())
+            if onProgress is not None:
+                onProgress(self.progress())
+
+        def onStep():
+            if time.perf_counter() >= nextCheckpoint[0]:
+                save()
+                nextCheckpoint[0] = time.perf_counter() + checkpointSeconds
+
+        with ins.timer("latinSquare"):
+            result = self.isFeasible and self.search(nodeLimit, deadline, onStep)
+        self.isPaused = result is None
+        self.solved = result is True
+        save()
+        ins.count("backtrackingNodes", self.nodes)
+        ins.count("backtracks", self.backtracks)
+        return self.square() if self.solved else None
+
+    def solveWithRestarts(self, nodeLimit=RESTART_NODES, growth=RESTART_GROWTH):
+        # randomized searches cut off after a growing number of nodes, heavy tails of a single search are avoided
+        # every aborted search unwinds completely, so the next one starts from the same propagated state
+        startTime = time.perf_counter()
+        self.solved = False
+        while self.isFeasible:
+            self.nodeLimit = self.nodes + int(nodeLimit)
+            self.isAborted = False
+            self.isStarted = False
+            self.solved = self.search()
+            if self.solved or not self.isAborted:
+                break
+            self.restarts += 1
+            nodeLimit *= growth
+        self.seconds = time.perf_counter() - startTime
+        return self.square() if self.solved else None
+
+    def square(self):
+        square = np.zeros((self.size, self.size), dtype=np.uint8)
+        for (rowIndex, columnIndex), variable in self.fieldVariables.items():
+            square[rowIndex][columnIndex] = max(self.values[variable], 0)
+        return square
+
+    def solve(self):
+        startTime = time.perf_counter()
+        with ins.timer("latinSquare"):
+            self.solved = self.isFeasible and self.search()
+        self.seconds = time.perf_counter() - startTime
+        ins.count("backtrackingNodes", self.nodes)
+        ins.count("backtracks", self.backtracks)
+        return self.square() if self.solved else None
+
+    def report(self):
+        return {
+            "size": self.size,
+            "symmetrical": self.symmetrical,
+            "solved": self.solved,
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "restarts": self.restarts,
+            "seconds": self.seconds,
+            "paused": self.isPaused
+        }
+
+
+def saveCheckpoint(path, checkpoint):
+    # written next to the old one and swapped in, so a crash while writing keeps the previous checkpoint
+    temporaryPath = path + ".tmp"
+    with open(temporaryPath, "w") as file:
+        json.dump(checkpoint, file)
+    os.replace(temporaryPath, path)
+
+
+def loadCheckpoint(path):
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def isProjectorSquare(square, subMatrices):
+    # the incidence matrix assembled from the square has to be a projective plane
+    matrix = bmg.generateInitialMatrix(len(subMatrices[0]))
+    bmg.applySubMatrices(matrix, subMatrices, square)
+    return pv.isProjectivePlane(matrix)
+
+
+def portfolioWorker(size, subMatrices, symmetrical, seed, workerIndex, results):
+    # the first worker runs the plain deterministic search, every other one randomized restarts
+    try:
+        if workerIndex == 0:
+            solver = LatinSquareSolver(size, subMatrices, symmetrical)
+            square = solver.solve()
+        else:
+            generator = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(workerIndex,)))
+            solver = LatinSquareSolver(size, subMatrices, symmetrical, generator)
+            square = solver.solveWithRestarts()
+        results.put((workerIndex, square, solver.report()))
+    except Exception as error:
+        results.put((workerIndex, None, {"error": repr(error)}))
+
+
+def portfolioLatinSquare(size, subMatrices, symmetrical=False, workers=None, seed=None):
+    # races differently ordered searches in separate processes and takes the first square
+    # giving a valid plane, the rest of the processes are terminated right away
+    # returns (square or None, report of the search that found it)
+    workers = workers or multiprocessing.cpu_count()
+    seed = np.random.SeedSequence(seed).entropy
+    subMatrices = np.asarray(subMatrices)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=portfolioWorker,
+        args=(size, subMatrices, symmetrical, seed, workerIndex, results), daemon=True)
+        for workerIndex in range(workers)]
+    for process in processes:
+        process.start()
+
+    found = None
+    report = {"solved": False}
+    finished = set()
+    exited = set()
+    try:
+        while len(finished) < workers:
+            try:
+                workerIndex, square, workerReport = results.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                # a worker killed before reporting (out of memory, a signal) never puts anything into the queue,
+                # it is only given up on when found dead twice in a row, so a result still on its way isn't lost
+                dead = {index for index, process in enumerate(processes)
+                    if index not in finished and process.exitcode is not None}
+                lost = dead & exited
+                exited = dead - lost
+                finished |= lost
+                if lost:
+                    report.setdefault("lostWorkers", []).extend(sorted(lost))
+                continue
+
+            finished.add(workerIndex)
+            if square is not None and isProjectorSquare(square, subMatrices):
+                found = square
+                report = dict(workerReport, worker=workerIndex)
+                if workerIndex != 0:
+                    found, report = preferDeterministic(results, subMatrices, found, report)
+                break
+            if square is None and "error" not in workerReport:
+                # a search only gives up after going through every possibility, so there is no square at all
+                report = dict(workerReport, worker=workerIndex)
+                break
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+    return found, report
+
+
+def preferDeterministic(results, subMatrices, found, report):
+    # the square of the deterministic search is the one every other build gets, so it wins a tie
+    while True:
+        try:
+            workerIndex, square, workerReport = results.get_nowait()
+        except queue.Empty:
+            return found, report
+        if workerIndex == 0 and square is not None and isProjectorSquare(square, subMatrices):
+            return square, dict(workerReport, worker=workerIndex)
+
+
+def latinSquare(size, subMatrices, symmetrical):
+    # counts squares of randomized workers in randomizedSquares, so callers know not to cache what they built
+    global randomizedSquares
+    if portfolioWorkers > 1:
+        square, report = portfolioLatinSquare(size, subMatrices, symmetrical, portfolioWorkers)
+        if square is not None and report.get("worker", 0) != 0:
+            randomizedSquares += 1
+        return square
+    return LatinSquareSolver(size, subMatrices, symmetrical).solve()
+
+
+def resumableLatinSquare(size, subMatrices, symmetrical=False, checkpointPath=None,
+        checkpointSeconds=CHECKPOINT_SECONDS, maxNodes=None, maxSeconds=None, onProgress=None):
+    # returns (square or None, progress report), the report says whether the search was only paused
+    solver = LatinSquareSolver(size, subMatrices, symmetrical)
+    square = solver.solveResumable(checkpointPath, checkpointSeconds, maxNodes, maxSeconds, onProgress)
+    return square, solver.progress()
+
+
+def projectorSquareSetup(order):
+    # blocks and the kind of latin square the ordered projection of a plane of this order uses
+    if order % 2 == 1:
+        # generate cyclical sub-matrices
+        # WARNING: Despite what a certain scientific paper claims,
+        # these may not be correct shapes to achieve a valid incidence matrix
+        # already verified it does NOT give a valid matrix for order of 9
+        # symmetrical squares work for smaller orders
+        return bmg.generateCyclicSubMatrices(order), order < 8
+    return bmg.generateEvenSizeSubMatrices(order), False
+
+
+def symmetricalLatinSquare(size, subMatrices):
+    return latinSquare(size, subMatrices, True)
+
+
+def asymmetricalLatinSquare(size, subMatrices):
+    return latinSquare(size, subMatrices, False)
+
+
+def printProgress(progress):
+    print("{nodes} nodes, {backtracks} backtracks, depth {depth}, {assigned}/{variables} assigned, "
+        "{seconds:.1f} s".format(**progress), flush=True)
+
+
+def parseArguments():
+    # python latin_square_solver.py 16 --checkpoint square16.json --max-seconds 3600
+    # running the same command again resumes the search, exit code 3 means it was paused and not finished
+    parser = argparse.ArgumentParser(description="Search for a latin square of the ordered projection")
+    parser.add_argument("order", type=int, help="order of the projective plane, the square has one less rows")
+    parser.add_argument("--checkpoint", default=None, help="json file the search is saved into and resumed from")
+    parser.add_argument("--checkpoint-seconds", type=float, default=CHECKPOINT_SECONDS)
+    parser.add_argument("--max-nodes", type=int, default=None, help="nodes searched by this run before it pauses")
+    parser.add_argument("--max-seconds", type=float, default=None, help="seconds of this run before it pauses")
+    return parser.parse_args()
+
+
+def main():
+    arguments = parseArguments()
+    subMatrices, symmetrical = projectorSquareSetup(arguments.order)
+    square, progress = resumableLatinSquare(arguments.order - 1, subMatrices, symmetrical, arguments.checkpoint,
+        arguments.checkpoint_seconds, arguments.max_nodes, arguments.max_seconds, printProgress)
+    if square is not None:
+        print(square)
+    elif progress["paused"]:
+        raise SystemExit(3)
+    else:
+        print("No latin square exists for a plane of order " + str(arguments.order))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+import numpy as np
+import argparse
+import math
+import warnings
+
+import batched_layout as bl
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# the force directed layout of card_creator written as plain loops over floats, with no small arrays or objects
+# the same functions either run as they are ("python") or get compiled by numba ("numba") when it is installed
+# every kernel repeats the arithmetic of card_creator in the same order, so all backends give the same layouts
+BACKENDS = ["object", "numpy", "python", "numba"]
+SQRT_2 = math.sqrt(2)
+EXPONENTIAL_END = bl.EXPONENTIAL_END
+ADAPTIVE_FACTOR = bl.ADAPTIVE_FACTOR
+ADAPTIVE_STEPS = bl.ADAPTIVE_STEPS
+
+
+def buildKernels(compile):
+    @compile
+    def isContained(coords, sizes, first, second):
+        higher = first if coords[first, 1] < coords[second, 1] else second
+        lower = first if higher == second else second
+        earlier = first if coords[first, 0] < coords[second, 0] else second
+        later = first if earlier == second else second
+        startOfEarlier = coords[earlier, 0]
+        endOfEarlier = startOfEarlier + sizes[earlier]
+        startOfHigher = coords[earlier, 1]
+        endOfHigher = startOfHigher + sizes[higher]
+
+        isHorizontalyAligned = coords[later, 0] >= startOfEarlier and coords[later, 0] < endOfEarlier
+        isVerticalyAligned = coords[lower, 1] >= startOfHigher and coords[lower, 1] < endOfHigher
+        return isVerticalyAligned and isHorizontalyAligned
+
+    @compile
+    def applyRepulsion(coords, sizes, numbers, displacements, first, second, kParameter, divisor):
+        distanceBuffer = 12 / divisor
+        forceModifier = 1.0
+        firstShift = sizes[first] / 2
+        secondShift = sizes[second] / 2
+        horizontal = (coords[first, 0] + firstShift) - (coords[second, 0] + secondShift)
+        vertical = (coords[first, 1] + firstShift) - (coords[second, 1] + secondShift)
+        length = math.sqrt(horizontal * horizontal + vertical * vertical)
+        if length < firstShift + secondShift:
+            # to signal that the symbols are overlapping
+            length = 0.0
+
+        if length > 0:
+            horizontal = horizontal * (length - firstShift - secondShift) / length
+            vertical = vertical * (length - firstShift - secondShift) / length
+            length = math.sqrt(horizontal * horizontal + vertical * vertical)
+
+        # ignore repulsive forces for large distances
+        if length > 40:
+            return
+
+        if length < distanceBuffer:
+            horizontal = coords[first, 0] - (coords[first, 0] + coords[second, 0]) / 2
+            vertical = coords[first, 1] - (coords[first, 1] + coords[second, 1]) / 2
+            vectorLength = math.sqrt(horizontal * horizontal + vertical * vertical)
+            if vectorLength == 0:
+                multiplier = 1.0 if numbers[first] < numbers[second] else -1.0
+                horizontal = coords[first, 0]
+                vertical = coords[first, 1]
+                vectorLength = math.sqrt(horizontal * horizontal + vertical * vertical)
+                if vectorLength == 0:
+                    horizontal = 1.0
+                    vertical = 1.0
+                    vectorLength = SQRT_2
+                horizontal = horizontal * multiplier
+                vertical = vertical * multiplier
+            horizontal = horizontal / vectorLength
+            vertical = vertical / vectorLength
+            length = 1.0
+            forceModifier = 1.2
+
+        force = (kParameter / length) ** 2
+        displacements[first, 0] += horizontal * force * forceModifier
+        displacements[first, 1] += vertical * force * forceModifier
+
+    @compile
+    def applyAttraction(coords, sizes, displacements, first, second, kParameter, divisor):
+        if isContained(coords, sizes, first, second):
+            return
+
+        distanceBuffer = 15 / divisor
+        firstShift = sizes[first] / 2
+        secondShift = sizes[second] / 2
+        horizontal = (coords[second, 0] + secondShift) - (coords[first, 0] + firstShift)
+        vertical = (coords[second, 1] + secondShift) - (coords[first, 1] + firstShift)
+        length = math.sqrt(horizontal * horizontal + vertical * vertical)
+        horizontal = horizontal / length
+        vertical = vertical / length
+        length = max(length - (firstShift + secondShift + distanceBuffer), 0.0)
+        displacements[first, 0] += horizontal * length ** 2 / kParameter
+        displacements[first, 1] += vertical * length ** 2 / kParameter
+        displacements[second, 0] -= horizontal * length ** 2 / kParameter
+        displacements[second, 1] -= vertical * length ** 2 / kParameter
+
+    @compile
+    def clampCoords(coords, sizes, index):
+        # coords are calculated as if symbol will be drawn starting from (0, 0)
+        size = sizes[index]
+        horizontal = min(49 - size, max(-49.0, coords[index, 0]))
+        vertical = min(49 - size, max(-49.0, coords[index, 1]))
+        distance = math.sqrt(horizontal * horizontal + vertical * vertical)
+        limit = 49.0
+        if horizontal > 0 or vertical > 0:
+            if horizontal > 0 and vertical > 0:
+                limit = 49 - size - 7
+            else:
+                if horizontal > 0:
+                    limit = math.sqrt(2401 - vertical * vertical) - size - 2
+                    if horizontal > limit:
+                        horizontal = limit
+                        vertical += 1
+                else:
+                    limit = math.sqrt(2401 - horizontal * horizontal) - size - 2
+                    if vertical > limit:
+                        vertical = limit
+                        horizontal += 1
+                coords[index, 0] = horizontal
+                coords[index, 1] = vertical
+                return
+
+        if distance >= limit:
+            scalar = limit / distance
+            horizontal *= scalar
+            vertical *= scalar
+        coords[index, 0] = horizontal
+        coords[index, 1] = vertical
+
+    @compile
+    def coolTemperature(cooling, temperature, startTemperature, iterations, energy, previousEnergy, progress):
+        # the schedules of batched_layout.coolTemperature, with cooling given by its index in COOLING_SCHEDULES
+        if cooling == 0:
+            return temperature - startTemperature / iterations, progress
+        if cooling == 1:
+            return temperature * EXPONENTIAL_END ** (1 / iterations), progress
+
+        if energy < previousEnergy:
+            progress += 1
+            if progress >= ADAPTIVE_STEPS:
+                return min(temperature / ADAPTIVE_FACTOR, startTemperature), 0
+            return min(temperature, startTemperature), progress
+        return min(temperature * ADAPTIVE_FACTOR, startTemperature), 0
+
+    @compile
+    def layoutCard(coords, sizes, numbers, symbols, iterations, temperature, cooling, tolerance):
+        # returns the number of iterations it took, a negative tolerance never stops early
+        count = coords.shape[0]
+        divisor = math.sqrt(symbols)
+        kParameter = math.sqrt(10000 / symbols)
+        startTemperature = temperature
+        progress = 0
+        previousEnergy = math.inf
+        displacements = np.zeros((count, 2), dtype=np.float64)
+        for loop in range(iterations):
+            for first in range(count):
+                for second in range(count):
+                    if first != second:
+                        applyRepulsion(coords, sizes, numbers, displacements, first, second, kParameter, divisor)
+
+            # the same ring and hubs of attraction edges as in card_creator
+            for i in range(count):
+                applyAttraction(coords, sizes, displacements, i, (i + 1) % count, kParameter, divisor)
+            for i in range(2, count - 1):
+                applyAttraction(coords, sizes, displacements, 0, i, kParameter, divisor)
+            for i in range(3, count):
+                applyAttraction(coords, sizes, displacements, 1, i, kParameter, divisor)
+
+            energy = 0.0
+            largestMove = 0.0
+            for index in range(count):
+                horizontal = displacements[index, 0]
+                vertical = displacements[index, 1]
+                dispLength = math.sqrt(horizontal * horizontal + vertical * vertical)
+                if dispLength != 0:
+                    previousHorizontal = coords[index, 0]
+                    previousVertical = coords[index, 1]
+                    step = min(dispLength, temperature)
+                    coords[index, 0] += horizontal / dispLength * step
+                    coords[index, 1] += vertical / dispLength * step
+                    clampCoords(coords, sizes, index)
+                    moveHorizontal = coords[index, 0] - previousHorizontal
+                    moveVertical = coords[index, 1] - previousVertical
+                    largestMove = max(largestMove, math.sqrt(moveHorizontal * moveHorizontal + moveVertical * moveVertical))
+                energy += dispLength * dispLength
+                displacements[index, 0] = 0.0
+                displacements[index, 1] = 0.0
+
+            temperature, progress = coolTemperature(cooling, temperature, startTemperature, iterations, energy,
+                previousEnergy, progress)
+            previousEnergy = energy
+            if largestMove < tolerance:
+                return loop + 1
+
+        return iterations
+
+    @compile
+    def layoutCards(coords, sizes, numbers, symbols, iterations, temperature, cooling, tolerance, iterationCounts):
+        for card in range(coords.shape[0]):
+            iterationCounts[card] = layoutCard(coords[card], sizes[card], numbers[card], symbols, iterations,
+                temperature, cooling, tolerance)
+
+    return layoutCards
+
+
+kernelCache = {}
+
+
+def compiler(backend):
+    if backend != "numba":
+        return lambda function: function
+    if numba is None:
+        warnings.warn("Numba is not installed, falling back to the python backend", RuntimeWarning, stacklevel=3)
+        return lambda function: function
+    return numba.njit
+
+
+def layoutKernel(backend):
+    # kernels are built once per process, numba compiles them on their first call
+    if backend not in kernelCache:
+        kernelCache[backend] = buildKernels(compiler(backend))
+    return kernelCache[backend]
+
+
+def annealCards(coords, sizes, numbers, symbols, iterations=50, temperature=15, cooling="linear", tolerance=None,
+        backend="python"):
+    # same interface as batched_layout.annealCards
+    if cooling not in bl.COOLING_SCHEDULES:
+        raise ValueError("Unknown cooling schedule " + str(cooling))
+    coords = np.array(coords, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    numbers = np.asarray(numbers, dtype=np.int64)
+    iterationCounts = np.zeros(coords.shape[0], dtype=np.int64)
+    layoutKernel(backend)(coords, sizes, numbers, symbols, iterations, float(temperature),
+        bl.COOLING_SCHEDULES.index(cooling), -1.0 if tolerance is None else float(tolerance), iterationCounts)
+    return coords, iterationCounts
+
+
+def layoutCards(coords, sizes, numbers, symbols, iterations=50, temperature=15, cooling="linear", tolerance=None,
+        backend="python"):
+    return annealCards(coords, sizes, numbers, symbols, iterations, temperature, cooling, tolerance, backend)[0]
+
+
+def checkEquivalence(symbolsOnCard, backends, seed=0, cooling="linear", tolerance=None):
+    # lays out the same seeded cards with every backend and compares them to the object loop of card_creator
+    import card_creator as cc
+    import field_projector as fp
+
+    isEquivalent = True
+    for numberOfSymbols in symbolsOnCard:
+        deck = fp.symbolDeck(numberOfSymbols)
+        if deck is None:
+            continue
+        reference = None
+        for backend in ["object"] + backends:
+            cardList = cc.createSymbolLists(numberOfSymbols, deck, seed)
+            iterationCounts = cc.layoutWithBackend(cardList, numberOfSymbols, backend, cooling, tolerance)
+            coords = np.array([[symbol.coords for symbol in symbolList] for symbolList in cardList])
+            if reference is None:
+                reference = coords
+                referenceCounts = iterationCounts
+                continue
+            difference = np.abs(coords - reference).max()
+            # chaotic annealing lets last bit differences grow, but not beyond a fraction of a pixel
+            isClose = difference < 1e-3 and np.array_equal(iterationCounts, referenceCounts)
+            isEquivalent = isEquivalent and isClose
+            print(str(numberOfSymbols) + " symbols, " + backend + ": largest difference " + str(difference)
+                + ("" if isClose else " FAILED"))
+    return isEquivalent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare layouts of every backend on the same seeded cards")
+    parser.add_argument("symbols", type=int, nargs="*", default=[5, 6, 8])
+    parser.add_argument("--backend", choices=BACKENDS[1:], nargs="+", default=BACKENDS[1:])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cooling", choices=bl.COOLING_SCHEDULES, default="linear")
+    parser.add_argument("--tolerance", type=float, default=None)
+    arguments = parser.parse_args()
+    if not checkEquivalence(arguments.symbols, arguments.backend, arguments.seed, arguments.cooling,
+            arguments.tolerance):
+        raise SystemExit(1)
@@ -0,0 +1,51 @@
+# library entry point for embedding the generator in other services, importing it builds and writes nothing
+# LazyDeck(order).cards() yields laid out cards one at a time, so a preview of a few cards doesn't pay for a whole deck
+# numpy, the layout modules and the plane itself are only loaded once the first card is asked for
+# with the same seed, method and options every card is the same as the one card_creator writes into GameTypes.json
+# nothing is written into the caches of planes and difference sets unless useCache is set,
+# so a preview works on a read only install as well
+class LazyDeck:
+    def __init__(self, order, method=None, seed=None, options=None, useCache=False):
+        self.order = order
+        self.symbols = order + 1
+        self.method = method
+        # None draws a new seed on first use, which is kept so every card of the deck comes from the same one
+        self.seed = seed
+        self.options = options
+        self.useCache = useCache
+        self.plane = None
+
+    def __len__(self):
+        return self.order * (self.order + 1) + 1
+
+    def deck(self):
+        # deck.Deck with symbols of every card, built or loaded from the cache on first use
+        if self.plane is None:
+            import field_projector as fp
+            self.plane = fp.symbolDeck(self.symbols, self.method, self.useCache)
+            if self.plane is None:
+                raise ValueError("No projective plane of order " + str(self.order) + " can be constructed")
+        return self.plane
+
+    def deckSeed(self):
+        if self.seed is None:
+            import card_creator as cc
+            self.seed = cc.newSeed()
+        return self.seed
+
+    def cards(self, cardIndices=None, chunkSize=1):
+        # cards in the form of GameTypes.json, chunkSize of them are laid out together
+        import card_creator as cc
+        plane = self.deck()
+        seed = self.deckSeed()
+        cardIndices = list(range(len(plane)) if cardIndices is None else cardIndices)
+        for start in range(0, len(cardIndices), chunkSize):
+            chunk = cardIndices[start:start + chunkSize]
+            yield from cc.cardsJSON(cc.displaceSymbolsOnCards(self.symbols, plane, seed, chunk, self.options))
+
+    def card(self, index):
+        return next(self.cards([index]))
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
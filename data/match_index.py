@@ -0,0 +1,126 @@
+import numpy as np
+import argparse
+import json
+
+import difference_set as ds
+import field_projector as fp
+
+
+# precomputed answers to "which symbol do these two cards share", so checking a guess never scans symbol lists
+# cards are numbered by their position in a deck of GameTypes.json and symbols by their ids before any displacement
+# "table" keeps the symbol of every pair of cards as the upper triangle of the pair table, n (n - 1) / 2 entries
+# "cyclic" only works for singer decks, where card j holds symbols j - d for every d of a perfect difference set
+# two cards a and b then share a - d for the only d with d' - d = b - a, so a single array of n offsets is enough
+INDEX_KINDS = ["table", "cyclic"]
+
+
+def pairPosition(first, second, cards):
+    # position of the pair (first, second), first < second, in the upper triangle stored row by row
+    return first * (2 * cards - first - 1) // 2 + second - first - 1
+
+
+def upperTriangle(deck):
+    firsts, seconds = np.triu_indices(len(deck), 1)
+    return deck.sharedSymbols(firsts, seconds)
+
+
+def cyclicOffsets(order):
+    differenceSet = ds.perfectDifferenceSet(order)
+    size = order * (order + 1) + 1
+    # offsets[d' - d] = d, every non-zero difference comes up exactly once in a perfect difference set
+    offsets = np.full(size, -1, dtype=np.int64)
+    offsets[(differenceSet[None, :] - differenceSet[:, None]) % size] = differenceSet[:, None]
+    offsets[0] = -1
+    return offsets
+
+
+class MatchIndex:
+    def __init__(self, symbols, cards, kind, values):
+        if kind not in INDEX_KINDS:
+            raise ValueError("Unknown match index kind " + str(kind))
+        self.symbols = symbols
+        self.cards = cards
+        self.kind = kind
+        self.values = np.asarray(values, dtype=np.int32)
+        # plain list, indexing it with a python int is several times faster than indexing an array
+        self.lookup = self.values.tolist()
+
+    def sharedSymbol(self, first, second):
+        if first == second or not (0 <= first < self.cards and 0 <= second < self.cards):
+            raise IndexError("No pair of cards " + str(first) + " and " + str(second))
+        if self.kind == "cyclic":
+            return (first - self.lookup[(second - first) % self.cards]) % self.cards
+        if first > second:
+            first, second = second, first
+        return self.lookup[pairPosition(first, second, self.cards)]
+
+    def sharedSymbols(self, firsts, seconds):
+        # vectorized sharedSymbol for arrays of pairs, without the bounds checks
+        firsts = np.asarray(firsts, dtype=np.int64)
+        seconds = np.asarray(seconds, dtype=np.int64)
+        if self.kind == "cyclic":
+            return (firsts - self.values[(seconds - firsts) % self.cards]) % self.cards
+        lower = np.minimum(firsts, seconds)
+        higher = np.maximum(firsts, seconds)
+        return self.values[pairPosition(lower, higher, self.cards)]
+
+    def isMatch(self, first, second, symbol):
+        return self.sharedSymbol(first, second) == symbol
+
+    def toJSON(self):
+        return {"symbols": self.symbols, "cards": self.cards, "kind": self.kind, "values": self.lookup}
+
+
+def matchIndex(numberOfSymbols, method=None, kind="table"):
+    deck = fp.symbolDeck(numberOfSymbols, method)
+    if deck is None:
+        return None
+    if kind == "cyclic":
+        if fp.projectionMethod(numberOfSymbols - 1, method) != "singer":
+            raise ValueError("Cyclic match index needs a deck built with the singer method")
+        return MatchIndex(numberOfSymbols, len(deck), kind, cyclicOffsets(numberOfSymbols - 1))
+    return MatchIndex(numberOfSymbols, len(deck), kind, upperTriangle(deck))
+
+
+def writeMatchIndices(file, symbolsOnCard, method=None, kind="table"):
+    indices = [matchIndex(numberOfSymbols, method, kind) for numberOfSymbols in symbolsOnCard]
+    json.dump([index.toJSON() for index in indices if index is not None], file)
+
+
+def loadMatchIndices(file):
+    # symbols on a card mapped to the index of that deck
+    return {entry["symbols"]: MatchIndex(entry["symbols"], entry["cards"], entry["kind"], entry["values"])
+        for entry in json.load(file)}
+
+
+def parseArguments():
+    parser = argparse.ArgumentParser(description="Build and query indices of symbols shared by pairs of cards")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="write match indices of given decks into a json file")
+    build.add_argument("symbols", type=int, nargs="+")
+    build.add_argument("--output", default="GameTypes.matches.json")
+    build.add_argument("--method", choices=["ordered", "field", "singer"], default=None)
+    build.add_argument("--kind", choices=INDEX_KINDS, default="table")
+
+    lookup = commands.add_parser("lookup", help="print the symbol shared by two cards")
+    lookup.add_argument("path")
+    lookup.add_argument("symbols", type=int)
+    lookup.add_argument("first", type=int)
+    lookup.add_argument("second", type=int)
+    return parser.parse_args()
+
+
+def main():
+    arguments = parseArguments()
+    if arguments.command == "build":
+        with open(arguments.output, "w") as file:
+            writeMatchIndices(file, arguments.symbols, arguments.method, arguments.kind)
+    else:
+        with open(arguments.path, "r") as file:
+            indices = loadMatchIndices(file)
+        print(indices[arguments.symbols].sharedSymbol(arguments.first, arguments.second))
+
+
+if __name__ == "__main__":
+    main()
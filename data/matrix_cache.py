@@ -0,0 +1,220 @@
+import numpy as np
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# persistent cache for incidence matrices and latin squares, so repeated deck builds skip the combinatorics
+# every entry is a plain .npy file named after its kind, construction method, order and version of the code building it
+# the index keeps a sha256 checksum of each file, a file that doesn't match it is treated as missing
+# the checksum is only computed again once size or modification time of the file differ from the ones in the index
+# writers of the index take a lock, so parallel builds don't drop each other's entries
+# without fcntl (on windows) there is no lock and concurrent builds may lose an entry, which is only built again
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+INDEX_NAME = "index.json"
+LOCK_NAME = "index.lock"
+# changing any of these may change what is built, so entries of older code are never served
+CONSTRUCTION_SOURCES = ["field_projector.py", "finite_field_plane.py", "difference_set.py", "deck.py",
+    "binary_matrices_generator.py", "latin_square_solver.py", "incidence_checker.py",
+    "projector_latin_square_finder.py"]
+SOURCE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+version = None
+
+
+def constructionVersion():
+    global version
+    if version is None:
+        hash = hashlib.sha256()
+        for fileName in CONSTRUCTION_SOURCES:
+            with open(os.path.join(SOURCE_DIRECTORY, fileName), "rb") as file:
+                hash.update(fileName.encode() + b"\0" + file.read())
+        version = hash.hexdigest()[:12]
+    return version
+
+
+def entryKey(kind, order, method):
+    return kind + "-" + str(method) + "-" + str(order) + "-" + constructionVersion()
+
+
+@contextmanager
+def fileLock(lockPath):
+    # exclusive lock held for the whole read, modify and write of a shared file
+    if fcntl is None:
+        yield
+        return
+    with open(lockPath, "a") as lockFile:
+        fcntl.flock(lockFile, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lockFile, fcntl.LOCK_UN)
+
+
+def replaceFile(path, write, mode="w"):
+    # written into a uniquely named temporary file first and swapped in,
+    # so neither an interrupted run nor another process writing the same file leaves a broken one behind
+    descriptor, temporaryPath = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    # mkstemp makes files only the owner can read, the file gets the permissions open() would give it instead
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(temporaryPath, 0o666 & ~umask)
+    try:
+        with os.fdopen(descriptor, mode) as file:
+            write(file)
+        os.replace(temporaryPath, path)
+    except BaseException:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+        raise
+
+
+def indexPath(directory):
+    return os.path.join(directory, INDEX_NAME)
+
+
+def loadIndex(directory=CACHE_DIRECTORY):
+    if not os.path.exists(indexPath(directory)):
+        return {}
+    with open(indexPath(directory), "r") as file:
+        return json.load(file)
+
+
+def saveIndex(index, directory=CACHE_DIRECTORY):
+    # callers hold the lock of indexLock while loading, changing and saving the index
+    replaceFile(indexPath(directory), lambda file: json.dump(index, file, indent=4, sort_keys=True))
+
+
+def indexLock(directory=CACHE_DIRECTORY):
+    os.makedirs(directory, exist_ok=True)
+    return fileLock(os.path.join(directory, LOCK_NAME))
+
+
+def fileChecksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fileStamp(path):
+    status = os.stat(path)
+    return [status.st_size, status.st_mtime_ns]
+
+
+def storeMatrix(kind, order, method, matrix, directory=CACHE_DIRECTORY):
+    key = entryKey(kind, order, method)
+    fileName = key + ".npy"
+    path = os.path.join(directory, fileName)
+    with indexLock(directory):
+        # entries built by older code for the same kind, order and method are of no use anymore
+        evictEntries(kind, order, method, directory, isLocked=True)
+        replaceFile(path, lambda file: np.save(file, np.asarray(matrix)), "wb")
+        index = loadIndex(directory)
+        index[key] = {
+            "kind": kind,
+            "order": order,
+            "method": method,
+            "version": constructionVersion(),
+            "file": fileName,
+            "shape": list(np.shape(matrix)),
+            "dtype": str(np.asarray(matrix).dtype),
+            "sha256": fileChecksum(path),
+            "stamp": fileStamp(path)
+        }
+        saveIndex(index, directory)
+
+
+def isIntact(key, entry, path, directory):
+    # an unchanged file was checked when it was stored, a changed one is hashed and its new stamp kept
+    if entry.get("stamp") == fileStamp(path):
+        return True
+    if fileChecksum(path) != entry["sha256"]:
+        return False
+    with indexLock(directory):
+        index = loadIndex(directory)
+        if key in index:
+            index[key]["stamp"] = fileStamp(path)
+            saveIndex(index, directory)
+    return True
+
+
+def loadMatrix(kind, order, method, directory=CACHE_DIRECTORY, verify=True):
+    key = entryKey(kind, order, method)
+    entry = loadIndex(directory).get(key)
+    if entry is None:
+        return None
+
+    path = os.path.join(directory, entry["file"])
+    if not os.path.exists(path) or (verify and not isIntact(key, entry, path, directory)):
+        evictEntries(kind, order, method, directory)
+        return None
+
+    # memory mapped and read only, pages are only loaded once they are used
+    return np.load(path, mmap_mode="r")
+
+
+def cachedMatrix(kind, order, method, build, isStorable=None, directory=CACHE_DIRECTORY):
+    # isStorable, when given, is asked after building whether the matrix may be kept
+    try:
+        matrix = loadMatrix(kind, order, method, directory)
+    except OSError:
+        # an unreadable cache is no cache at all
+        matrix = None
+    if matrix is not None:
+        return matrix
+
+    matrix = build()
+    if matrix is not None and (isStorable is None or isStorable()):
+        try:
+            storeMatrix(kind, order, method, matrix, directory)
+        except OSError:
+            # read only installs still build, they only can't keep what they built
+            pass
+    return matrix
+
+
+def listEntries(directory=CACHE_DIRECTORY):
+    entries = []
+    for key, entry in sorted(loadIndex(directory).items()):
+        path = os.path.join(directory, entry["file"])
+        entry = dict(entry, key=key, bytes=os.path.getsize(path) if os.path.exists(path) else 0)
+        entries.append(entry)
+    return entries
+
+
+def evictEntries(kind=None, order=None, method=None, directory=CACHE_DIRECTORY, isLocked=False):
+    # None matches everything, so calling it without arguments clears the whole cache
+    # entries of every version are evicted, isLocked is set by callers already holding the lock of the index
+    if not isLocked:
+        with indexLock(directory):
+            return evictEntries(kind, order, method, directory, True)
+    index = loadIndex(directory)
+    evicted = []
+    for key, entry in list(index.items()):
+        if kind is not None and entry["kind"] != kind:
+            continue
+        if order is not None and entry["order"] != order:
+            continue
+        if method is not None and entry["method"] != method:
+            continue
+        path = os.path.join(directory, entry["file"])
+        if os.path.exists(path):
+            os.remove(path)
+        del index[key]
+        evicted.append(key)
+
+    if evicted:
+        saveIndex(index, directory)
+    return evicted
+
+
+if __name__ == "__main__":
+    print("Script to be used only in tandem with another one")
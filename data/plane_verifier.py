@@ -0,0 +1,269 @@
+import numpy as np
+import argparse
+import re
+
+import instrumentation as ins
+
+
+# verification of incidence matrices of finite projective planes without dense matrix products
+# rows (and then columns) are packed into 64 bit words, so the number of points two rows share
+# is the popcount of their bitwise AND summed over a handful of words
+# the Gram matrix is built in blocks of rows, which keeps memory bounded for any order
+# and every entry breaking the rules is reported with the pair of cards or symbols it belongs to
+# once rows take more than a few words, expanding the few points of each row is faster than the bit products
+PACKED_COLUMN_LIMIT = 256
+
+
+def popcount(words):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    # older numpy has no popcount, so count bits of every byte with a table instead
+    table = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+    return table[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1)
+
+
+def packWords(matrix):
+    packed = np.packbits(np.asarray(matrix, dtype=bool), axis=1, bitorder="little")
+    padding = (-packed.shape[1]) % 8
+    packed = np.pad(packed, ((0, 0), (0, padding)))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+def packedGramBlocks(matrix, blockSize):
+    # yields (start of the block, number of shared points of its rows with every row)
+    packed = packWords(matrix)
+    wordColumns = np.ascontiguousarray(packed.T)
+    for start in range(0, len(packed), blockSize):
+        block = packed[start:start + blockSize]
+        shared = np.zeros((len(block), len(packed)), dtype=np.int64)
+        # one word at a time, so a block never takes more than (block, rows) numbers
+        for word in range(packed.shape[1]):
+            shared += popcount(block[:, word, None] & wordColumns[word][None, :])
+        yield start, shared
+
+
+def coordinateGramBlocks(rows, columns, shape, blockSize):
+    # same as packedGramBlocks, but every point of a row is followed to the other rows through it
+    # a plane row has only q + 1 points, so this does about n^2 work instead of n^3 / 64 word operations
+    # takes (row, column) coordinates of the ones sorted by row, so a dense matrix is never needed
+    rowCount, columnCount = shape
+    columnOrder = np.argsort(columns, kind="stable")
+    rowsOfColumns = rows[columnOrder]
+    columnCounts = np.bincount(columns, minlength=columnCount)
+    columnStarts = np.cumsum(columnCounts) - columnCounts
+    rowStarts = np.searchsorted(rows, np.arange(rowCount + 1))
+    for start in range(0, rowCount, blockSize):
+        end = min(start + blockSize, rowCount)
+        blockRows = rows[rowStarts[start]:rowStarts[end]] - start
+        blockColumns = columns[rowStarts[start]:rowStarts[end]]
+        lengths = columnCounts[blockColumns]
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        otherRows = rowsOfColumns[np.repeat(columnStarts[blockColumns], lengths) + offsets]
+        pairs = np.repeat(blockRows, lengths) * rowCount + otherRows
+        shared = np.bincount(pairs, minlength=(end - start) * rowCount).reshape(end - start, rowCount)
+        yield start, shared
+
+
+def sparseGramBlocks(matrix, blockSize):
+    rows, columns = np.nonzero(matrix)
+    return coordinateGramBlocks(rows, columns, matrix.shape, blockSize)
+
+
+def gramBlocks(matrix, blockSize):
+    # packed bits are the fastest while rows fit into a few words, larger planes are sparse enough to expand
+    if matrix.shape[1] <= PACKED_COLUMN_LIMIT:
+        return packedGramBlocks(matrix, blockSize)
+    return sparseGramBlocks(matrix, blockSize)
+
+
+def offendingPairs(blocks, rowCount, expectedSize, limit=20):
+    # pairs of rows sharing anything else than a single point and rows with a wrong number of points
+    # returns them as (first, second, shared) with first == second for the size of a row
+    pairs = []
+    count = 0
+    for start, shared in blocks:
+        indices = np.arange(start, start + len(shared))
+        expected = np.ones_like(shared)
+        expected[np.arange(len(shared)), indices] = expectedSize
+        # only the upper triangle, every pair is looked at once
+        isWrong = (shared != expected) & (np.arange(rowCount)[None, :] >= indices[:, None])
+        wrongRows, wrongColumns = np.nonzero(isWrong)
+        count += len(wrongRows)
+        for row, column in zip(wrongRows, wrongColumns):
+            if len(pairs) >= limit:
+                break
+            pairs.append((int(indices[row]), int(column), int(shared[row, column])))
+    return pairs, count
+
+
+def emptyReport(shape):
+    report = {
+        "shape": list(shape),
+        "order": None,
+        "valid": False,
+        "symbolPairs": [],
+        "cardPairs": [],
+        "wrongSymbolPairs": 0,
+        "wrongCardPairs": 0
+    }
+    if len(shape) != 2 or shape[0] != shape[1]:
+        return report
+
+    # n = q^2 + q + 1 points, every line holds q + 1 of them
+    order = int(round((-1 + np.sqrt(4 * shape[0] - 3)) / 2))
+    if order * order + order + 1 == shape[0]:
+        report["order"] = order
+    return report
+
+
+def completeReport(report, symbolBlocks, cardBlocks, limit):
+    size = report["shape"][0]
+    order = report["order"]
+    report["symbolPairs"], report["wrongSymbolPairs"] = offendingPairs(symbolBlocks, size, order + 1, limit)
+    report["cardPairs"], report["wrongCardPairs"] = offendingPairs(cardBlocks, size, order + 1, limit)
+    report["valid"] = report["wrongSymbolPairs"] == 0 and report["wrongCardPairs"] == 0
+    return report
+
+
+def verifyIncidence(matrix, blockSize=256, limit=20):
+    # rows are symbols and columns are cards, the same way card_creator reads the matrix
+    ins.count("verifyIncidence")
+    matrix = np.asarray(matrix, dtype=bool)
+    report = emptyReport(matrix.shape)
+    if report["order"] is None:
+        return report
+    return completeReport(report, gramBlocks(matrix, blockSize), gramBlocks(matrix.T, blockSize), limit)
+
+
+def verifyCardSymbols(cardSymbols, symbolCount=None, blockSize=256, limit=20):
+    # the same report for a deck.Deck style (cards, symbols on a card) array of symbol ids
+    ins.count("verifyCardSymbols")
+    cardSymbols = np.asarray(cardSymbols, dtype=np.int64)
+    symbolCount = len(cardSymbols) if symbolCount is None else symbolCount
+    report = emptyReport((symbolCount, len(cardSymbols)))
+    if report["order"] is None:
+        return report
+
+    cards = np.repeat(np.arange(len(cardSymbols)), cardSymbols.shape[1])
+    symbols = cardSymbols.ravel()
+    symbolOrder = np.argsort(symbols, kind="stable")
+    shape = (symbolCount, symbolCount)
+    symbolBlocks = coordinateGramBlocks(symbols[symbolOrder], cards[symbolOrder], shape, blockSize)
+    cardBlocks = coordinateGramBlocks(cards, symbols, shape, blockSize)
+    return completeReport(report, symbolBlocks, cardBlocks, limit)
+
+
+# cards checked against every later card by StreamVerifier, memory of the check is this many rows of symbols
+STREAM_SAMPLES = 64
+
+
+class StreamVerifier:
+    # checks a deck whose cards come one block at a time without keeping them, so not every pair can be compared
+    # every card needs q + 1 distinct symbols, every symbol has to end up on q + 1 cards
+    # and every card has to share exactly one symbol with each sampled card that came before it
+    # samples are picked at random from the whole deck, with as many samples as cards the check is exact
+    def __init__(self, symbolCount, samples=STREAM_SAMPLES, seed=0, limit=20):
+        self.symbolCount = symbolCount
+        self.order = emptyReport((symbolCount, symbolCount))["order"]
+        self.limit = limit
+        self.cardCount = 0
+        self.symbolCounts = np.zeros(symbolCount, dtype=np.int64)
+        samples = min(samples, symbolCount)
+        generator = np.random.default_rng(seed)
+        self.sampledCards = set(generator.choice(symbolCount, samples, replace=False).tolist())
+        # membership rows of sampled cards that already came, with the index of the card of each row
+        self.samples = np.zeros((samples, symbolCount), dtype=bool)
+        self.sampleIndices = []
+        self.cardPairs = []
+        self.wrongCardPairs = 0
+        self.checkedCardPairs = 0
+
+    def wrongPair(self, first, second, shared):
+        self.wrongCardPairs += 1
+        if len(self.cardPairs) < self.limit:
+            self.cardPairs.append((int(first), int(second), int(shared)))
+
+    def addCards(self, cardSymbols):
+        ins.count("verifiedCards", len(cardSymbols))
+        for symbols in np.asarray(cardSymbols, dtype=np.int64):
+            card = self.cardCount
+            self.cardCount += 1
+            symbols = np.unique(symbols[(symbols >= 0) & (symbols < self.symbolCount)])
+            if self.order is None or len(symbols) != self.order + 1:
+                self.wrongPair(card, card, len(symbols))
+            self.symbolCounts[symbols] += 1
+
+            sampleCount = len(self.sampleIndices)
+            shared = self.samples[:sampleCount, symbols].sum(axis=1)
+            self.checkedCardPairs += sampleCount
+            for sample in np.nonzero(shared != 1)[0]:
+                self.wrongPair(self.sampleIndices[sample], card, shared[sample])
+            if card in self.sampledCards:
+                self.samples[sampleCount, symbols] = True
+                self.sampleIndices.append(card)
+
+    def report(self):
+        # the same report as verifyCardSymbols, symbol pairs only hold symbols on a wrong number of cards
+        report = emptyReport((self.symbolCount, self.cardCount))
+        report["sampledCards"] = len(self.sampleIndices)
+        report["checkedCardPairs"] = self.checkedCardPairs
+        if report["order"] is None:
+            return report
+
+        wrongSymbols = np.nonzero(self.symbolCounts != report["order"] + 1)[0]
+        report["symbolPairs"] = [(int(symbol), int(symbol), int(self.symbolCounts[symbol]))
+            for symbol in wrongSymbols[:self.limit]]
+        report["wrongSymbolPairs"] = len(wrongSymbols)
+        report["cardPairs"] = self.cardPairs
+        report["wrongCardPairs"] = self.wrongCardPairs
+        report["valid"] = report["wrongSymbolPairs"] == 0 and report["wrongCardPairs"] == 0
+        return report
+
+
+def isProjectivePlane(matrix):
+    return verifyIncidence(matrix, limit=0)["valid"]
+
+
+def describeReport(report):
+    if report["order"] is None:
+        return "Matrix of shape " + str(report["shape"]) + " can't be an incidence matrix of a projective plane"
+    if report["valid"]:
+        return "Valid projective plane of order " + str(report["order"])
+
+    lines = ["Broken projective plane of order " + str(report["order"]) + ", "
+        + str(report["wrongCardPairs"]) + " wrong card pairs and "
+        + str(report["wrongSymbolPairs"]) + " wrong symbol pairs"]
+    for first, second, shared in report["cardPairs"]:
+        if first == second:
+            lines.append("card " + str(first) + " holds " + str(shared) + " symbols")
+        else:
+            lines.append("cards " + str(first) + " and " + str(second) + " share " + str(shared) + " symbols")
+    for first, second, shared in report["symbolPairs"]:
+        if first == second:
+            lines.append("symbol " + str(first) + " is on " + str(shared) + " cards")
+        else:
+            lines.append("symbols " + str(first) + " and " + str(second) + " meet on " + str(shared) + " cards")
+    return "\n".join(lines)
+
+
+def loadMatrix(path):
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    # plain text rows of 0s and 1s, like order_9.csv
+    with open(path, "r") as file:
+        rows = [re.findall(r"\d", line) for line in file]
+    return np.array([row for row in rows if row], dtype=np.uint8)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify incidence matrices of finite projective planes")
+    parser.add_argument("paths", nargs="+", help=".npy or text files with rows of 0s and 1s")
+    parser.add_argument("--limit", type=int, default=20, help="number of offending pairs listed")
+    arguments = parser.parse_args()
+    isEveryValid = True
+    for path in arguments.paths:
+        report = verifyIncidence(loadMatrix(path), limit=arguments.limit)
+        isEveryValid = isEveryValid and report["valid"]
+        print(path + ": " + describeReport(report))
+    if not isEveryValid:
+        raise SystemExit(1)
@@ -2,11 +2,17 @@ import numpy as np
 
 import binary_matrices_generator as bmg
 
+import incidence_checker as ic
+
+import instrumentation as ins
+
 
 # this script is used to receive latin squares giving valid incidence matrix
 # with the use of backtracking algorithm
 # it is very time consuming for greater orders of matrixes
 # due to O(n^2) complexity of each check, which could theorhetically be called up to n^2 times
+# to cut it down, every assigned block is checked right away against the partially filled matrix
+# so a square that can't give a valid plane is rejected long before all of it is filled
 class SquareField:
     def __init__(self, size, idx, rowIndex):
         self.possibilities = self.initPossibilities(size, idx, rowIndex)
@@ -74,19 +80,21 @@ def verifyIncidence(subMatrices, assignments):
     matrix = bmg.generateInitialMatrix(order)
     bmg.applySubMatrices(matrix, subMatrices, assignments)
 
-    for rowIndex in range(len(matrix)):
-        for followingRowIndex in range(rowIndex + 1, len(matrix)):
-            isIncident = False
-            for pointIterator in range(len(matrix)):
-                firstPoint = matrix[rowIndex][pointIterator]
-                secondPoint = matrix[followingRowIndex][pointIterator]
-                if firstPoint == 1 and secondPoint == 1:
-                    if isIncident:
-                        return False
-                    isIncident = True
-            if not isIncident:
-                return False
-    return True
+    return ic.hasUniqueIntersections(ic.packRows(matrix))
+
+
+def assignBlocks(checker, blocks, symbol):
+    # blocks on the diagonal would be given twice, so duplicates are dropped
+    blocks = list(dict.fromkeys(blocks))
+    for rowIndex, columnIndex in blocks:
+        checker.assign(rowIndex, columnIndex, symbol)
+
+    return all(checker.isConsistent(rowIndex, columnIndex) for rowIndex, columnIndex in blocks)
+
+
+def unassignBlocks(checker, blocks):
+    for rowIndex, columnIndex in blocks:
+        checker.unassign(rowIndex, columnIndex)
 
 
 def getSymmetricPermutations(halfSquare):
@@ -102,26 +110,29 @@ def extractPermutations(squareField):
     return [[column.symbol for column in row] for row in squareField]
 
 
-def asymmetricDepthFill(square, size, columnIndex, rowIndex, subMatrices):
+def asymmetricDepthFill(square, size, columnIndex, rowIndex, checker):
+    ins.count("backtrackingNodes")
     # since the used latin square must be isomorphic, we use the same rows as columns
     currentField = square[rowIndex][columnIndex]
     secondField = square[columnIndex][rowIndex]
+    blocks = [(rowIndex, columnIndex), (columnIndex, rowIndex)]
     for possibility in currentField.possibilities:
         if secondField.possibilities.count(possibility) == 0:
             continue
 
         if currentField.setSymbol(possibility):
             if secondField.setSymbol(possibility):
-                newColumnIndex = (columnIndex + 1) % size
-                newRowIndex = rowIndex
-                if newColumnIndex == 0:
-                    newRowIndex += 1
-                    newColumnIndex = newRowIndex
-                    if newRowIndex == size:
-                        permutations = extractPermutations(square)
-                        return verifyIncidence(subMatrices, permutations)
-                if asymmetricDepthFill(square, size, newColumnIndex, newRowIndex, subMatrices):
-                    return True
+                if assignBlocks(checker, blocks, possibility):
+                    newColumnIndex = (columnIndex + 1) % size
+                    newRowIndex = rowIndex
+                    if newColumnIndex == 0:
+                        newRowIndex += 1
+                        newColumnIndex = newRowIndex
+                        if newRowIndex == size:
+                            return checker.isValid()
+                    if asymmetricDepthFill(square, size, newColumnIndex, newRowIndex, checker):
+                        return True
+                unassignBlocks(checker, blocks)
 
             secondField.massUndoErasure(possibility)
         currentField.massUndoErasure(possibility)
@@ -130,29 +141,34 @@ def asymmetricDepthFill(square, size, columnIndex, rowIndex, subMatrices):
     return False
 
 
-def depthFill(halfSquare, size, columnIndex, rowIndex, subMatrices):
+def depthFill(halfSquare, size, columnIndex, rowIndex, checker):
+    ins.count("backtrackingNodes")
     currentField = halfSquare[rowIndex][columnIndex]
     # we try to make a projector latin square
     tryProjecting = True if columnIndex < size // 2 else False
     secondField = currentField
+    # every field of the half square is also placed in the mirrored half
+    blocks = [(rowIndex, columnIndex), (size - rowIndex - 1, size - columnIndex - 1)]
     if tryProjecting:
         secondField = halfSquare[columnIndex][rowIndex]
+        blocks += [(columnIndex, rowIndex), (size - columnIndex - 1, size - rowIndex - 1)]
     for possibility in currentField.possibilities:
         if tryProjecting and secondField.possibilities.count(possibility) == 0:
             continue
 
         if currentField.setSymbol(possibility):
             if not tryProjecting or secondField.setSymbol(possibility):
-                newColumnIndex = (columnIndex + 1) % (size - 1)
-                newRowIndex = rowIndex
-                if newColumnIndex == 0:
-                    newRowIndex += 1
-                    newColumnIndex = newRowIndex
-                    if newRowIndex == size // 2:
-                        permutations = getSymmetricPermutations(halfSquare)
-                        return verifyIncidence(subMatrices, permutations)
-                if depthFill(halfSquare, size, newColumnIndex, newRowIndex, subMatrices):
-                    return True
+                if assignBlocks(checker, blocks, possibility):
+                    newColumnIndex = (columnIndex + 1) % (size - 1)
+                    newRowIndex = rowIndex
+                    if newColumnIndex == 0:
+                        newRowIndex += 1
+                        newColumnIndex = newRowIndex
+                        if newRowIndex == size // 2:
+                            return checker.isValid()
+                    if depthFill(halfSquare, size, newColumnIndex, newRowIndex, checker):
+                        return True
+                unassignBlocks(checker, blocks)
             if tryProjecting:
                 secondField.massUndoErasure(possibility)
         currentField.massUndoErasure(possibility)
@@ -172,8 +188,14 @@ def symmetricalLatinSquare(size, subMatrices):
             for columnAdjacency in range(fieldColumn + 1, size - 1):
                 halfSquare[fieldRow][fieldColumn].connect(halfSquare[fieldRow][columnAdjacency])
 
+    checker = ic.IncidenceChecker(subMatrices)
+    for rowIndex, fieldRow in enumerate(halfSquare):
+        for columnIndex, field in enumerate(fieldRow):
+            if field.symbol != -1:
+                assignBlocks(checker, [(rowIndex, columnIndex), (size - rowIndex - 1, size - columnIndex - 1)], field.symbol)
+
     # it isn't constrained enough to make it impossible to fill, so we ignore checking resulsts at the end
-    depthFill(halfSquare, size, 1, 1, subMatrices)
+    depthFill(halfSquare, size, 1, 1, checker)
 
     return np.asarray(getSymmetricPermutations(halfSquare), dtype=np.uint8)
 
@@ -204,8 +226,14 @@ def asymmetricalLatinSquare(size, subMatrices):
         for j in range(i + 1, size):
             square[i][i].connect(square[j][j])
 
+    checker = ic.IncidenceChecker(subMatrices)
+    for rowIndex, fieldRow in enumerate(square):
+        for columnIndex, field in enumerate(fieldRow):
+            if field.symbol != -1:
+                checker.assign(rowIndex, columnIndex, field.symbol)
+
     # it isn't constrained enough to make it impossible to fill, so we ignore checking resulsts at the end
-    asymmetricDepthFill(square, size, 1, 1, subMatrices)
+    asymmetricDepthFill(square, size, 1, 1, checker)
     
     return np.asarray(extractPermutations(square), dtype=np.uint8)
 
@@ -1,13 +1,17 @@
 
 import numpy as np
-import math
+
+import instrumentation as ins
 
 
 class Symbol:
     def __init__(self, coords, size):
         self.size = size
+        # exact position on the card, used by geometric_unravel
+        self.position = np.array([coords[0] + 50, coords[1] + 50], dtype=np.float64)
+        # clipped, so coordinates outside of the card can't wrap around the uint8 range
         self.coords = np.array(
-            [round(coords[0] + 50), round(coords[1] + 50)], 
+            [min(max(round(coords[0] + 50), 0), 98 - size), min(max(round(coords[1] + 50), 0), 98 - size)],
             dtype=np.uint8)
 
     def verifyPosition(self, matrix, startCoords=None):
@@ -17,84 +21,110 @@ class Symbol:
         if lowerBoundBroken or upperBoundBroken:
             return False
 
-        for i in range(self.size + 2):
-            for j in range(self.size + 2):
-                rowIndex = coords[1] + i
-                columnIndex = coords[0] + j
-                if matrix[rowIndex][columnIndex] != 0:
-                    return False
-
-        return True
+        rowIndex = int(coords[1])
+        columnIndex = int(coords[0])
+        return not matrix[rowIndex:rowIndex + self.size + 2, columnIndex:columnIndex + self.size + 2].any()
 
     def placeSymbol(self, matrix, undo=False):
-        for i in range(self.size + 2):
-            for j in range(self.size + 2):
-                rowIndex = self.coords[1] + i
-                columnIndex = self.coords[0] + j
-                value = matrix[rowIndex][columnIndex]
-                matrix[rowIndex][columnIndex] = (value - 1) if undo else (value + 1)
+        rowIndex = int(self.coords[1])
+        columnIndex = int(self.coords[0])
+        area = matrix[rowIndex:rowIndex + self.size + 2, columnIndex:columnIndex + self.size + 2]
+        if undo:
+            area -= 1
+        else:
+            area += 1
 
 
 def generateMatrix():
-    matrix = np.zeros((100, 100), dtype=np.uint8)
     radiusSquared = 2401
-
-    for i in range(100):
-        for j in range(100):
-            firstCircleParam = (i - 50) ** 2
-            secondCircleParam = (j - 50) ** 2
-            if firstCircleParam + secondCircleParam > radiusSquared:
-                matrix[i][j] = 1
-    
-    return matrix
-
-
-def checkRadius(matrix, symbol, radius):
-    centerCoords = np.astype(symbol.coords, np.int16)
-    radiusSquared = radius ** 2
-    yShiftsList = []
-    for i in range(radius):
-        circleParamsSquared = radiusSquared - (i - centerCoords[0]) ** 2
-        yShift = round(math.sqrt(0 if circleParamsSquared < 0 else circleParamsSquared))
-        yShiftsList.append(yShift)
-
-    coordsList = []
-    for i in range(radius - 1):
-        coordsList.append([centerCoords[0] + i, centerCoords[1] + yShiftsList[i]])
-        coordsList.append([centerCoords[0] + i, centerCoords[1] - yShiftsList[i]])
-        coordsList.append([centerCoords[0] - i, centerCoords[1] + yShiftsList[i]])
-        coordsList.append([centerCoords[0] - i, centerCoords[1] - yShiftsList[i]])
-    
-    coordsList.append([centerCoords[0] + radius - 1, centerCoords[1]])
-    coordsList.append([centerCoords[0] - radius - 1, centerCoords[1]])
-
-    for coords in coordsList:
-        if symbol.verifyPosition(matrix, coords):
-            symbol.coords = np.asarray(coords, dtype=np.uint8)
-            return True
+    indices = np.arange(100)
+    firstCircleParams = (indices[:, None] - 50) ** 2
+    secondCircleParams = (indices[None, :] - 50) ** 2
+    return (firstCircleParams + secondCircleParams > radiusSquared).astype(np.uint8)
+
+
+def summedAreaTable(matrix):
+    # table[i][j] is the sum of matrix[:i, :j], so any box sum takes four lookups
+    table = np.zeros((matrix.shape[0] + 1, matrix.shape[1] + 1), dtype=np.int32)
+    table[1:, 1:] = matrix.cumsum(axis=0, dtype=np.int32).cumsum(axis=1)
+    return table
+
+
+def freePositions(table, coordsArray, size):
+    # vectorized verifyPosition for many candidates at once
+    horizontal = coordsArray[:, 0]
+    vertical = coordsArray[:, 1]
+    isInside = (horizontal >= 0) & (vertical >= 0) & (horizontal < 99 - size) & (vertical < 99 - size)
+    # coordinates outside of the card are clipped only to keep the lookups valid, they are never free anyway
+    start = np.clip(coordsArray, 0, 98 - size)
+    end = start + size + 2
+    boxSums = table[end[:, 1], end[:, 0]] - table[start[:, 1], end[:, 0]] \
+        - table[end[:, 1], start[:, 0]] + table[start[:, 1], start[:, 0]]
+    return isInside & (boxSums == 0)
+
+
+def ringOffsets(radii):
+    # static part of the candidates checked in a circle around a symbol, in the order they are tried
+    # every radius has four mirrored shifts for each index below radius - 1 and two horizontal ones at the end
+    ringRadii = []
+    ringIndices = []
+    horizontalOffsets = []
+    verticalSigns = []
+    for radius in radii:
+        for i in range(radius - 1):
+            ringRadii += [radius] * 4
+            ringIndices += [i] * 4
+            horizontalOffsets += [i, i, -i, -i]
+            verticalSigns += [1, -1, 1, -1]
+        ringRadii += [radius, radius]
+        ringIndices += [0, 0]
+        horizontalOffsets += [radius - 1, -radius - 1]
+        verticalSigns += [0, 0]
+    return (np.array(ringRadii), np.array(ringIndices), np.array(horizontalOffsets), np.array(verticalSigns))
+
+
+# if placement for shifted symbol in radius is not found, the symbol is too large to be moved
+SEARCHED_RADII = range(1, 85)
+SEARCHED_OFFSETS = ringOffsets(SEARCHED_RADII)
+
+
+def ringCoords(centerCoords, offsets):
+    ringRadii, ringIndices, horizontalOffsets, verticalSigns = offsets
+    circleParamsSquared = ringRadii ** 2 - (ringIndices - centerCoords[0]) ** 2
+    yShifts = np.round(np.sqrt(np.maximum(circleParamsSquared, 0))).astype(np.int64)
+    return np.stack([centerCoords[0] + horizontalOffsets, centerCoords[1] + verticalSigns * yShifts], axis=1)
+
+
+def moveToFreePosition(table, symbol, offsets):
+    coordsArray = ringCoords(symbol.coords.astype(np.int64), offsets)
+    isFree = freePositions(table, coordsArray, symbol.size)
+    if isFree.any():
+        # the first free candidate, just like trying them one by one
+        symbol.coords = coordsArray[np.argmax(isFree)].astype(np.uint8)
+        return True
 
     return False
 
 
+def checkRadius(matrix, symbol, radius, table=None):
+    if table is None:
+        table = summedAreaTable(matrix)
+    return moveToFreePosition(table, symbol, ringOffsets([radius]))
+
+
 def verifySymbol(matrix, symbol):
     symbol.placeSymbol(matrix, True)
     if not symbol.verifyPosition(matrix):
-        # if placement for shifted symbol in radius is not found, the symbol is too large to be moved
-        for radius in range(1, 85):
-            if checkRadius(matrix, symbol, radius):
-                break
+        # the matrix doesn't change while looking for a place, so every radius is checked in a single pass
+        moveToFreePosition(summedAreaTable(matrix), symbol, SEARCHED_OFFSETS)
 
     symbol.placeSymbol(matrix)
 
 
 def verifyMatrix(matrix):
-    for i in range(100):
-        for j in range(100):
-            if matrix[i][j] < 0:
-                raise OverflowError('Removed more than what was placed')
-            if matrix[i][j] > 1:
-                return False
-    return True
+    if (matrix < 0).any():
+        raise OverflowError('Removed more than what was placed')
+    return not (matrix > 1).any()
 
 
 def unravelSymbols(symbolList):
@@ -105,6 +135,7 @@ def unravelSymbols(symbolList):
     isValid = verifyMatrix(matrix)
     upperCorrectionLimit = 3
     while (not isValid) and upperCorrectionLimit > 0:
+        ins.count("unravelRetries")
         for symbol in symbolList:
             verifySymbol(matrix, symbol)
         isValid = verifyMatrix(matrix)
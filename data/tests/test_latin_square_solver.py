@@ -0,0 +1,37 @@
+import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import binary_matrices_generator as bmg
+import latin_square_solver as lss
+
+
+# order 8 has an asymmetrical square found after a few dozen nodes
+def solver():
+    return lss.LatinSquareSolver(7, bmg.generateEvenSizeSubMatrices(8))
+
+
+def test_solved_checkpoint_gives_the_same_square(tmp_path):
+    path = str(tmp_path / "square.json")
+    square = solver().solveResumable(path)
+    assert square is not None
+    again = solver().solveResumable(path)
+    assert again is not None
+    assert np.array_equal(square, again)
+
+
+def test_resumed_search_finds_the_square_of_an_uninterrupted_one(tmp_path):
+    # every run gets the same budget of nodes, which has to be enough to finish after a few of them
+    path = str(tmp_path / "square.json")
+    uninterrupted = solver()
+    expected = uninterrupted.solve()
+    for _ in range(uninterrupted.nodes):
+        resumed = solver()
+        square = resumed.solveResumable(path, maxNodes=5)
+        if not resumed.isPaused:
+            break
+    assert not resumed.isPaused
+    assert np.array_equal(square, expected)
+    assert resumed.nodes == uninterrupted.nodes